@@ -2,9 +2,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from .config import Config
+from .replica import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
@@ -13,6 +14,18 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Encode JSON responses with orjson when available
+    from .json_provider import init_json
+    init_json(app)
+    
+    # Request, SQL and stage timing for /metrics and Server-Timing
+    from .metrics import init_metrics
+    init_metrics(app)
+    
+    # Green database waits under gevent workers
+    from .cooperative import init_cooperative
+    init_cooperative(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     login_manager.init_app(app)
@@ -21,10 +34,12 @@ def create_app(config_class=Config):
     from .routes.auth import auth_bp
     from .routes.candidates import candidates_bp
     from .routes.search import search_bp
+    from .routes.metrics import metrics_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(candidates_bp)
     app.register_blueprint(search_bp)
+    app.register_blueprint(metrics_bp)
     
     # Create upload folder if it doesn't exist
     import os
@@ -0,0 +1,55 @@
+"""
+Cooperative serving support for the HR Recruitment System.
+Lets gevent workers overlap GPT and database waits instead of blocking a worker per request.
+
+Run with gunicorn's gevent worker class, which monkey-patches sockets,
+threads and sleeps before the app is imported:
+    gunicorn -k gevent --worker-connections 100 -w 2 'run:app'
+"""
+from . import db
+
+try:
+    from gevent import monkey
+except ImportError:  # pragma: no cover - optional dependency
+    monkey = None
+
+def is_cooperative():
+    """True when gevent has patched the socket module in this process"""
+    return monkey is not None and monkey.is_module_patched('socket')
+
+def _gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback that yields to other greenlets while the server works"""
+    import psycopg2
+    from psycopg2 import extensions
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+def release_db_connection():
+    """
+    End the session's read transaction before a slow external call.
+
+    The pooled connection goes back to the pool instead of idling in a
+    transaction while GPT answers, so a cooperative worker with many
+    requests in flight needs far fewer connections. Anything pending is
+    committed, so call it only where the session holds no half-done work.
+    """
+    db.session.commit()
+
+def init_cooperative(app):
+    """Make psycopg2 cooperative when running under gevent workers"""
+    if not is_cooperative():
+        return
+
+    from psycopg2 import extensions
+    extensions.set_wait_callback(_gevent_wait_callback)
+    app.logger.info("gevent detected: database and OpenAI calls yield to other requests")
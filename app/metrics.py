@@ -0,0 +1,200 @@
+"""
+Instrumentation for the HR Recruitment System.
+Request, SQL and pipeline-stage timings exposed in Prometheus text format and Server-Timing headers.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Seconds; covers fast queries up to slow GPT calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values)) + '}'
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {value}')
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series['counts']):
+                    labels = _format_labels(self.labelnames + ('le',), key + (bound,))
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.labelnames + ('le',), key + ('+Inf',))
+                lines.append(f'{self.name}_bucket{labels} {series["count"]}')
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f'{self.name}_sum{labels} {series["sum"]}')
+                lines.append(f'{self.name}_count{labels} {series["count"]}')
+        return lines
+
+REQUEST_DURATION = Histogram(
+    'hr_http_request_duration_seconds', 'HTTP request latency by endpoint',
+    ('endpoint', 'method', 'status')
+)
+REQUEST_DB_QUERIES = Histogram(
+    'hr_http_request_db_queries', 'SQL statements executed per HTTP request',
+    ('endpoint',), COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    'hr_http_request_db_seconds', 'Time spent in SQL per HTTP request', ('endpoint',)
+)
+DB_QUERY_DURATION = Histogram('hr_db_query_duration_seconds', 'SQL statement latency')
+STAGE_DURATION = Histogram('hr_stage_duration_seconds', 'Pipeline stage latency', ('stage',))
+OPENAI_REQUEST_DURATION = Histogram(
+    'hr_openai_request_duration_seconds', 'OpenAI API call latency including retries', ('kind', 'outcome')
+)
+OPENAI_RETRIES = Counter('hr_openai_retries_total', 'OpenAI API calls retried', ('kind',))
+GPT_TOKENS = Counter('hr_gpt_tokens_total', 'Tokens reported by the OpenAI API', ('kind', 'type'))
+RESUME_PACK_RESULTS = Counter(
+    'hr_gpt_packed_resumes_total', 'Resumes sent in packed extraction requests by outcome', ('outcome',)
+)
+
+REGISTRY = [
+    REQUEST_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, DB_QUERY_DURATION,
+    STAGE_DURATION, OPENAI_REQUEST_DURATION, OPENAI_RETRIES, GPT_TOKENS, RESUME_PACK_RESULTS,
+]
+
+def render_metrics():
+    """
+    Render every metric in Prometheus text exposition format.
+
+    Values are per process; with several workers, scrape each one or
+    aggregate in Prometheus.
+
+    Returns:
+        str: Exposition text
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Time a block as a named pipeline stage.
+
+    The duration goes to hr_stage_duration_seconds and, inside a request,
+    to the Server-Timing header.
+
+    Args:
+        stage (str): Stage name, e.g. 'extract'
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        if has_request_context():
+            g.setdefault('stage_timings', []).append((stage, elapsed))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.observe(elapsed)
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+def _finish_request(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    REQUEST_DB_QUERIES.observe(g.db_queries, endpoint=endpoint)
+    REQUEST_DB_SECONDS.observe(g.db_seconds, endpoint=endpoint)
+
+    if current_app.config['SERVER_TIMING']:
+        entries = [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in g.get('stage_timings', [])]
+        entries.append(f'db;dur={g.db_seconds * 1000:.1f};desc="{g.db_queries} queries"')
+        entries.append(f'total;dur={elapsed * 1000:.1f}')
+        response.headers.add('Server-Timing', ', '.join(entries))
+    return response
+
+_engine_hooks_installed = False
+
+def init_metrics(app):
+    """Install request and SQL hooks when METRICS_ENABLED is set"""
+    global _engine_hooks_installed
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    # Engine-class listeners cover every engine the app uses
+    if not _engine_hooks_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _engine_hooks_installed = True
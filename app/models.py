@@ -1,5 +1,8 @@
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import Computed, DDL, event, func, select, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import load_only
 from werkzeug.security import generate_password_hash, check_password_hash
 from . import db, login_manager
 
@@ -25,12 +28,74 @@ class User(UserMixin, db.Model):
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Flask-Login user loader function"""
-    return User.query.get(int(user_id))
+    """Flask-Login user loader function, served from the per-process user cache"""
+    from .services.auth_service import get_cached_user
+    return get_cached_user(int(user_id))
+
+# Link tables between candidates and the canonical skill/certification taxonomy
+candidate_skills = db.Table(
+    'candidate_skills',
+    db.Column('candidate_id', db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('idx_candidate_skills_skill', 'skill_id', 'candidate_id')
+)
+
+candidate_certifications = db.Table(
+    'candidate_certifications',
+    db.Column('candidate_id', db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('certification_id', db.Integer, db.ForeignKey('certifications.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('idx_candidate_certifications_certification', 'certification_id', 'candidate_id')
+)
+
+# MinHash LSH buckets for near-duplicate lookup; negative bands hold name and phone keys
+candidate_lsh_bands = db.Table(
+    'candidate_lsh_bands',
+    db.Column('band', db.SmallInteger, primary_key=True),
+    db.Column('bucket', db.BigInteger, primary_key=True),
+    db.Column('candidate_id', db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('idx_candidate_lsh_bands_candidate', 'candidate_id')
+)
+
+class Skill(db.Model):
+    """Canonical skill name"""
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Display form, e.g. JavaScript
+    key = db.Column(db.String(100), unique=True, nullable=False)  # Lowercased lookup key
+    
+    def __repr__(self):
+        return f'<Skill {self.name}>'
+
+class Certification(db.Model):
+    """Canonical certification name"""
+    __tablename__ = 'certifications'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Display form, e.g. CA
+    key = db.Column(db.String(100), unique=True, nullable=False)  # Lowercased lookup key
+    
+    def __repr__(self):
+        return f'<Certification {self.name}>'
+
+# Weighted full-text document: name and skills rank above certifications,
+# industry and level, then education and contact details, then experience
+CANDIDATE_SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(array_to_string_immutable(skills, ' '), '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(array_to_string_immutable(certifications, ' '), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(industry, '') || ' ' || coalesce(experience_level, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(education, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(email, '') || ' ' || coalesce(phone, '')), 'C') ||
+    setweight(to_tsvector('english', coalesce(experience, '')), 'D')
+"""
 
 class Candidate(db.Model):
     """Candidate model for storing CV information"""
     __tablename__ = 'candidates'
+    __table_args__ = (
+        db.Index('idx_candidates_search_vector', 'search_vector', postgresql_using='gin'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -44,12 +109,39 @@ class Candidate(db.Model):
     industry = db.Column(db.String(100))
     certifications = db.Column(db.ARRAY(db.String))  # CA, CIMA, CFA, etc.
     resume_path = db.Column(db.String(255))  # Path to stored resume
+    embedding = db.deferred(db.Column(db.LargeBinary))  # float32 vector for job-match shortlisting
+    minhash = db.deferred(db.Column(db.LargeBinary))  # uint32 MinHash signature for duplicate detection
+    search_vector = db.deferred(db.Column(TSVECTOR, Computed(CANDIDATE_SEARCH_VECTOR, persisted=True)))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     
+    canonical_skills = db.relationship('Skill', secondary=candidate_skills, passive_deletes=True)
+    canonical_certifications = db.relationship('Certification', secondary=candidate_certifications, passive_deletes=True)
+    
+    # Columns shown in result lists; the long text columns are left unloaded
+    SUMMARY_FIELDS = ('id', 'name', 'email', 'experience_level', 'industry', 'skills', 'certifications', 'created_at')
+    
+    @classmethod
+    def summary_columns(cls):
+        """Loader option restricting a query to the summary projection"""
+        return load_only(*(getattr(cls, field) for field in cls.SUMMARY_FIELDS))
+    
+    def to_summary_dict(self):
+        """Convert candidate to the summary dictionary used by list endpoints"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'skills': self.skills,
+            'experience_level': self.experience_level,
+            'industry': self.industry,
+            'certifications': self.certifications,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+    
     def to_dict(self):
-        """Convert candidate to dictionary for API responses"""
+        """Convert candidate to the full dictionary for detail responses"""
         return {
             'id': self.id,
             'name': self.name,
@@ -64,3 +156,196 @@ class Candidate(db.Model):
             'certifications': self.certifications,
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
+
+# The generated search_vector column needs an immutable array_to_string
+event.listen(Candidate.__table__, 'before_create', DDL("""
+    CREATE OR REPLACE FUNCTION array_to_string_immutable(anyarray, text)
+    RETURNS text AS $$ SELECT array_to_string($1, $2); $$ LANGUAGE SQL IMMUTABLE
+"""))
+
+# Bumped after every committed change to candidates; cached job-match rankings
+# computed at an older value are stale
+candidate_set_version = db.Sequence('candidate_set_version', metadata=db.metadata)
+
+class CandidateStat(db.Model):
+    """Compacted candidate count per dimension value; pending changes are in CandidateStatDelta"""
+    __tablename__ = 'candidate_stats'
+    __table_args__ = (
+        db.Index('idx_candidate_stats_dimension_count', 'dimension', 'count'),
+    )
+    
+    dimension = db.Column(db.String(32), primary_key=True)  # total, experience_level, industry, skill, certification
+    value = db.Column(db.Text, primary_key=True)  # '' stands for NULL
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class CandidateStatDelta(db.Model):
+    """
+    Count change appended by one candidates statement, folded into candidate_stats by compaction.
+    
+    Writers only ever insert here, so concurrent saves, enrichment jobs and
+    ingest batches do not queue on the shared total/level/industry rows.
+    """
+    __tablename__ = 'candidate_stat_deltas'
+    __table_args__ = (
+        db.Index('idx_candidate_stat_deltas_dimension_value', 'dimension', 'value'),
+    )
+    
+    id = db.Column(db.BigInteger, primary_key=True)
+    dimension = db.Column(db.String(32), nullable=False)
+    value = db.Column(db.Text, nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("(now() AT TIME ZONE 'UTC')"))
+
+def candidate_stat_counts():
+    """Current counts, compacted plus pending: subquery of (dimension, value, count, updated_at)"""
+    rows = union_all(
+        select(CandidateStat.dimension, CandidateStat.value, CandidateStat.count, CandidateStat.updated_at),
+        select(CandidateStatDelta.dimension, CandidateStatDelta.value, CandidateStatDelta.delta,
+               CandidateStatDelta.created_at),
+    ).subquery('stat_rows')
+    return select(
+        rows.c.dimension, rows.c.value,
+        func.sum(rows.c.count).label('count'), func.max(rows.c.updated_at).label('updated_at')
+    ).group_by(rows.c.dimension, rows.c.value).subquery('candidate_stat_counts')
+
+# One statement's worth of candidate changes as (dimension, value, delta) rows.
+# {changed} yields (delta, experience_level, industry, skills, certifications).
+CANDIDATE_STATS_DELTAS = """
+    WITH changed AS ({changed})
+    SELECT dimension, value, sum(delta) AS delta
+    FROM (
+        SELECT 'total' AS dimension, '' AS value, delta FROM changed
+        UNION ALL SELECT 'experience_level', coalesce(experience_level, ''), delta FROM changed
+        UNION ALL SELECT 'industry', coalesce(industry, ''), delta FROM changed
+        UNION ALL SELECT 'skill', skill, delta FROM changed, unnest(skills) AS skill
+        UNION ALL SELECT 'certification', cert, delta FROM changed, unnest(certifications) AS cert
+    ) deltas
+    GROUP BY dimension, value
+    HAVING sum(delta) <> 0
+"""
+
+# Folds (dimension, value, delta) rows from {deltas} into candidate_stats
+CANDIDATE_STATS_UPSERT = """
+    INSERT INTO candidate_stats AS s (dimension, value, count, updated_at)
+    SELECT dimension, value, sum(delta), now() AT TIME ZONE 'UTC'
+    FROM ({deltas}) AS deltas
+    GROUP BY dimension, value
+    ORDER BY dimension, value
+    ON CONFLICT (dimension, value) DO UPDATE
+    SET count = s.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at
+"""
+
+# Moves every pending delta into candidate_stats in one statement and returns
+# how many it moved; deltas appended meanwhile wait for the next run
+CANDIDATE_STATS_COMPACT = f"""
+    WITH moved AS (DELETE FROM candidate_stat_deltas RETURNING dimension, value, delta),
+    folded AS ({CANDIDATE_STATS_UPSERT.format(deltas='SELECT dimension, value, delta FROM moved')})
+    SELECT count(*) FROM moved
+"""
+
+def candidate_stats_source(table, delta):
+    """SELECT feeding CANDIDATE_STATS_DELTAS from a candidates-shaped table"""
+    return f"SELECT {delta} AS delta, experience_level, industry, skills, certifications FROM {table}"
+
+def _append_deltas(changed):
+    return f"INSERT INTO candidate_stat_deltas (dimension, value, delta) {CANDIDATE_STATS_DELTAS.format(changed=changed)}"
+
+# Statement-level triggers keep the counts in step with every write path,
+# including bulk ingestion, with one append-only insert per statement.
+# Re-running it (e.g. init-db adding candidate_stat_deltas to an older
+# database) replaces the triggers and recounts candidate_stats.
+CANDIDATE_STATS_TRIGGERS = f"""
+    CREATE OR REPLACE FUNCTION candidate_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {_append_deltas(candidate_stats_source('new_rows', 1))};
+        ELSIF TG_OP = 'DELETE' THEN
+            {_append_deltas(candidate_stats_source('old_rows', -1))};
+        ELSE
+            {_append_deltas(
+                candidate_stats_source('new_rows', 1) + ' UNION ALL ' + candidate_stats_source('old_rows', -1)
+            )};
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS candidate_stats_insert ON candidates;
+    DROP TRIGGER IF EXISTS candidate_stats_update ON candidates;
+    DROP TRIGGER IF EXISTS candidate_stats_delete ON candidates;
+
+    CREATE TRIGGER candidate_stats_insert AFTER INSERT ON candidates
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
+    CREATE TRIGGER candidate_stats_update AFTER UPDATE ON candidates
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
+    CREATE TRIGGER candidate_stats_delete AFTER DELETE ON candidates
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
+    DELETE FROM candidate_stats;
+    {CANDIDATE_STATS_UPSERT.format(deltas=CANDIDATE_STATS_DELTAS.format(changed=candidate_stats_source('candidates', 1)))};
+"""
+
+@event.listens_for(db.metadata, 'after_create')
+def create_candidate_stats_triggers(target, connection, tables=None, **kw):
+    """Install the triggers and seed the counts once the delta table is created"""
+    if any(table.name == 'candidate_stat_deltas' for table in tables or []):
+        connection.exec_driver_sql(CANDIDATE_STATS_TRIGGERS)
+
+class ResumeCacheEntry(db.Model):
+    """Cached GPT extraction keyed on resume text, model and prompt version"""
+    __tablename__ = 'resume_cache'
+    
+    key = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest
+    model = db.Column(db.String(64))
+    prompt_version = db.Column(db.String(16))
+    result = db.Column(db.JSON, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    hit_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ResumeFile(db.Model):
+    """Stored resume PDF addressed by content hash and shared by identical uploads"""
+    __tablename__ = 'resume_files'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest of the PDF
+    path = db.Column(db.String(255), nullable=False)
+    size_bytes = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Candidates whose resume_path is this file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ResumeJob(db.Model):
+    """Background resume-processing job"""
+    __tablename__ = 'resume_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True)  # UUID
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    stage = db.Column(db.String(32))
+    progress = db.Column(db.Integer, default=0)  # Percent complete
+    result = db.Column(db.JSON)
+    status_code = db.Column(db.Integer)  # HTTP status the synchronous endpoint would have returned
+    error = db.Column(db.Text)
+    resume_path = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    
+    def to_dict(self):
+        """Convert job to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'result': self.result,
+            'status_code': self.status_code,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
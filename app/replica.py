@@ -0,0 +1,91 @@
+"""
+Read-replica routing for the HR Recruitment System.
+Sends opted-in reads to the 'replica' bind while it is within REPLICA_MAX_LAG of the primary.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+# Seconds the replica has not yet replayed; 0 when caught up or when the bind is not a standby
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+_lag_lock = threading.Lock()
+_lag_state = {'checked_at': None, 'usable': False}
+
+@contextmanager
+def replica_reads():
+    """
+    Route the SELECTs in a block to the read replica when one is usable.
+
+    Flushes and INSERT/UPDATE/DELETE statements still go to the primary,
+    so a block that writes stays correct, but its reads may not see those
+    writes. Without a replica bind this does nothing.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def _check_lag(engine):
+    """Measure replication lag; an unreachable replica counts as unusable"""
+    try:
+        with engine.connect() as connection:
+            lag = float(connection.execute(REPLICA_LAG_SQL).scalar() or 0)
+    except Exception as e:
+        current_app.logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+        return False
+
+    if lag > current_app.config['REPLICA_MAX_LAG']:
+        current_app.logger.warning(f"Read replica is {lag:.1f}s behind, reading from the primary")
+        return False
+    return True
+
+def replica_usable(engine):
+    """
+    Whether the replica is within REPLICA_MAX_LAG, re-checked at most every REPLICA_LAG_CHECK_INTERVAL.
+
+    Args:
+        engine (Engine): Replica engine
+
+    Returns:
+        bool: True if reads may go to the replica
+    """
+    now = time.monotonic()
+    with _lag_lock:
+        checked_at = _lag_state['checked_at']
+        if checked_at is not None and now - checked_at < current_app.config['REPLICA_LAG_CHECK_INTERVAL']:
+            return _lag_state['usable']
+        # Claim the check so concurrent readers keep the previous answer meanwhile
+        _lag_state['checked_at'] = now
+
+    usable = _check_lag(engine)
+    with _lag_lock:
+        _lag_state['usable'] = usable
+    return usable
+
+class RoutingSession(Session):
+    """Session that sends reads inside replica_reads() to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replica_reads.get() and not self._flushing and not isinstance(clause, UpdateBase):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None and replica_usable(engine):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -3,9 +3,15 @@ from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from ..models import Candidate
 from .. import db
-from ..services.cv_service import save_resume, extract_text_from_pdf, extract_contact_info, clean_text
-from ..services.gpt_service import process_resume_with_gpt
-import os
+from ..services.cv_service import save_resume
+from ..services.storage_service import add_resume_references, release_resume
+from ..services.dedup_service import find_duplicates, index_candidates
+from ..services.resume_service import process_resume_file
+from ..services.job_service import submit_resume_job, get_job, queue_enrichment, apply_pending_enrichment
+from ..services.embedding_service import compute_candidate_embedding
+from ..services.taxonomy_service import normalize_skills, normalize_certifications, link_candidates
+from ..services.match_service import bump_candidate_set_version
+from ..metrics import stage_timer
 import json
 
 candidates_bp = Blueprint('candidates', __name__)
@@ -30,43 +36,32 @@ def process_resume():
         return jsonify({'error': 'No file selected'}), 400
     
     # Save the uploaded file
-    file_path = save_resume(file)
+    with stage_timer('save'):
+        file_path = save_resume(file)
     if not file_path:
         return jsonify({'error': 'Invalid file format. Only PDF files are allowed.'}), 400
     
-    try:
-        # Extract text from PDF
-        resume_text = extract_text_from_pdf(file_path)
-        if not resume_text:
-            return jsonify({'error': 'Failed to extract text from PDF'}), 500
-        
-        # Clean the extracted text
-        cleaned_text = clean_text(resume_text)
-        
-        # Extract basic contact info using regex as a fallback
-        contact_info = extract_contact_info(cleaned_text)
-        
-        # Process with GPT
-        candidate_data = process_resume_with_gpt(cleaned_text)
-        
-        if not candidate_data:
-            # If GPT fails, return basic info with error
-            return jsonify({
-                'error': 'Partial processing only. GPT analysis failed.',
-                'email': contact_info.get('email'),
-                'phone': contact_info.get('phone'),
-                'resume_path': file_path
-            }), 207  # 207 Multi-Status
-        
-        # Add resume path to the data
-        candidate_data['resume_path'] = file_path
-        
-        # Return the processed data
-        return jsonify(candidate_data)
+    # In job mode, return immediately and let a background worker do the work
+    if request.values.get('mode') == 'job':
+        job = submit_resume_job(file_path, current_user.id)
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('candidates.get_resume_job', job_id=job.id)
+        }), 202
     
-    except Exception as e:
-        current_app.logger.error(f"Error in process_resume: {str(e)}")
-        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+    result, status_code = process_resume_file(file_path)
+    queue_enrichment(result, file_path, current_user.id)
+    return jsonify(result), status_code
+
+@candidates_bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_resume_job(job_id):
+    """Get progress and result of a background resume-processing job"""
+    job = get_job(job_id, user_id=None if current_user.is_admin else current_user.id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
 @candidates_bp.route('/save-candidate', methods=['POST'])
 @login_required
@@ -85,6 +80,19 @@ def save_candidate():
             if existing_candidate:
                 return jsonify({'error': 'A candidate with this email already exists'}), 409
         
+        # Store canonical skill and certification names
+        data['skills'] = normalize_skills(data.get('skills', []))
+        data['certifications'] = normalize_certifications(data.get('certifications', []))
+        
+        # Near-duplicates (same person, new email or reformatted CV) need confirmation
+        if current_app.config['DEDUP_ENABLED'] and not data.get('allow_duplicate'):
+            duplicates = find_duplicates(data)
+            if duplicates:
+                return jsonify({
+                    'error': 'This candidate looks like a duplicate of an existing candidate',
+                    'duplicates': duplicates
+                }), 409
+        
         # Create new candidate
         candidate = Candidate(
             name=data.get('name'),
@@ -98,12 +106,21 @@ def save_candidate():
             industry=data.get('industry'),
             certifications=data.get('certifications', []),
             resume_path=data.get('resume_path'),
+            embedding=compute_candidate_embedding(data),
             created_by=current_user.id
         )
         
-        # Add to database
+        # Add to database and link to the taxonomy
         db.session.add(candidate)
+        db.session.flush()
+        link_candidates([(candidate.id, candidate.skills, candidate.certifications)])
+        add_resume_references([candidate.resume_path])
+        index_candidates([(candidate.id, data)])
         db.session.commit()
+        bump_candidate_set_version()
+        
+        # Merge GPT enrichment that finished before the candidate was saved
+        apply_pending_enrichment(candidate)
         
         return jsonify({
             'success': True,
@@ -130,13 +147,15 @@ def delete_candidate(candidate_id):
     candidate = Candidate.query.get_or_404(candidate_id)
     
     try:
-        # Delete the resume file if it exists
-        if candidate.resume_path and os.path.exists(candidate.resume_path):
-            os.remove(candidate.resume_path)
+        resume_path = candidate.resume_path
         
         # Delete from database
         db.session.delete(candidate)
         db.session.commit()
+        bump_candidate_set_version()
+        
+        # Delete the resume file once no other candidate shares it
+        release_resume(resume_path)
         
         return jsonify({'success': True, 'message': 'Candidate deleted successfully'})
     
@@ -0,0 +1,20 @@
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, request
+from ..metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint, served only when METRICS_TOKEN is set and presented as a bearer token"""
+    token = current_app.config['METRICS_TOKEN']
+    if not current_app.config['METRICS_ENABLED'] or not token:
+        abort(404)
+    
+    # Constant-time comparison; bytes so a non-ASCII header is a mismatch rather than a TypeError
+    presented = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(presented, f'Bearer {token}'.encode('utf-8')):
+        abort(401)
+    
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
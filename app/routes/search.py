@@ -1,9 +1,8 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, Response, render_template, request, jsonify, current_app, stream_with_context
 from flask_login import login_required
-from sqlalchemy import or_, func, and_
-from ..models import Candidate
-from .. import db
-from ..services.gpt_service import rank_candidates_for_job
+from ..replica import replica_reads
+from ..services.match_service import match_candidates
+from ..services.search_service import paginate_search, iter_search_results
 
 search_bp = Blueprint('search', __name__)
 
@@ -21,70 +20,60 @@ def search_candidates():
     if not data:
         return jsonify({'error': 'No search parameters provided'}), 400
     
-    # Get search parameters
-    query = data.get('query', '').strip()
-    skills = data.get('skills', [])
-    experience_level = data.get('experience_level')
-    industry = data.get('industry')
-    certifications = data.get('certifications', [])
-    
-    # Start with base query
-    candidates_query = Candidate.query
-    
-    # Apply filters if they exist
-    if query:
-        search_terms = query.split()
-        search_filters = []
-        for term in search_terms:
-            term_filter = or_(
-                Candidate.name.ilike(f'%{term}%'),
-                Candidate.email.ilike(f'%{term}%'),
-                Candidate.phone.ilike(f'%{term}%'),
-                Candidate.industry.ilike(f'%{term}%'),
-                Candidate.experience.ilike(f'%{term}%'),
-                Candidate.education.ilike(f'%{term}%')
-            )
-            search_filters.append(term_filter)
-        candidates_query = candidates_query.filter(and_(*search_filters))
-    
-    # Filter by skills
-    if skills:
-        for skill in skills:
-            candidates_query = candidates_query.filter(
-                func.array_to_string(Candidate.skills, ',').ilike(f'%{skill}%')
-            )
-    
-    # Filter by experience level
-    if experience_level:
-        candidates_query = candidates_query.filter(
-            Candidate.experience_level.ilike(f'%{experience_level}%')
-        )
-    
-    # Filter by industry
-    if industry:
-        candidates_query = candidates_query.filter(
-            Candidate.industry.ilike(f'%{industry}%')
-        )
-    
-    # Filter by certifications
-    if certifications:
-        for cert in certifications:
-            candidates_query = candidates_query.filter(
-                func.array_to_string(Candidate.certifications, ',').ilike(f'%{cert}%')
-            )
-    
     # Execute query
     try:
-        candidates = candidates_query.all()
+        page = paginate_search(data, cursor=data.get('cursor'), page_size=data.get('page_size'))
         
         # Convert to dictionary
-        result = [candidate.to_dict() for candidate in candidates]
-        return jsonify(result)
+        return jsonify({
+            'results': [candidate.to_summary_dict() for candidate in page['candidates']],
+            'next_cursor': page['next_cursor'],
+            'total_estimate': page['total_estimate'],
+            'facets': page['facets']
+        })
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     except Exception as e:
         current_app.logger.error(f"Error in search_candidates: {str(e)}")
         return jsonify({'error': f'Search failed: {str(e)}'}), 500
 
+@search_bp.route('/api/search/export', methods=['POST'])
+@login_required
+def export_candidates():
+    """API endpoint streaming every matching candidate as NDJSON or a JSON array"""
+    data = request.json
+    if data is None:
+        return jsonify({'error': 'No search parameters provided'}), 400
+    
+    output_format = data.get('format') or 'ndjson'
+    if output_format not in ('ndjson', 'json'):
+        return jsonify({'error': "format must be 'ndjson' or 'json'"}), 400
+    full = data.get('projection') == 'full'
+    
+    def generate():
+        candidates = iter_search_results(data, full=full)
+        try:
+            if output_format == 'json':
+                yield '['
+            for index, candidate in enumerate(candidates):
+                row = current_app.json.dumps(candidate.to_dict() if full else candidate.to_summary_dict())
+                if output_format == 'json':
+                    yield f"{',' if index else ''}{row}"
+                else:
+                    yield f"{row}\n"
+            if output_format == 'json':
+                yield ']'
+        except Exception as e:
+            # Headers are already sent, so the truncated body is the only signal
+            current_app.logger.error(f"Error in export_candidates: {str(e)}")
+        finally:
+            candidates.close()
+    
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @search_bp.route('/api/match-job', methods=['POST'])
 @login_required
 def match_job():
@@ -96,19 +85,11 @@ def match_job():
     job_requirements = data.get('requirements')
     
     try:
-        # Get all candidates
-        candidates = Candidate.query.all()
-        
-        if not candidates:
-            return jsonify([])
-        
-        # Convert candidates to dictionary format
-        candidate_profiles = [candidate.to_dict() for candidate in candidates]
-        
-        # Rank candidates for the job
-        ranked_candidates = rank_candidates_for_job(job_requirements, candidate_profiles)
+        # Shortlist (on the read replica when usable), rank with GPT and cache per candidate-set version
+        with replica_reads():
+            matches = match_candidates(job_requirements)
         
-        return jsonify(ranked_candidates)
+        return jsonify([dict(candidate.to_summary_dict(), score=score) for candidate, score in matches])
     
     except Exception as e:
         current_app.logger.error(f"Error in match_job: {str(e)}")
@@ -2,11 +2,78 @@
 Authentication service for the HR Recruitment System.
 Handles user authentication, registration, and password management.
 """
+import threading
+import time
+
 from flask import current_app
+from flask_login import UserMixin
 from werkzeug.security import generate_password_hash
 from ..models import User
 from .. import db
 
+# Upper bound on cached users per process; expired entries go first
+USER_CACHE_MAX_ENTRIES = 1024
+
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+class UserSnapshot(UserMixin):
+    """
+    Detached copy of the user fields requests read through current_user.
+
+    Holds no password hash and no session state, so it can be shared
+    between requests and threads. Load the User row to modify a user.
+    """
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = bool(user.is_admin)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+def get_cached_user(user_id):
+    """
+    Get a snapshot of a user for Flask-Login, querying at most once per USER_CACHE_TTL.
+
+    The cache is per process: changes made through this module invalidate
+    it at once here, other workers see them when their entry expires.
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        UserSnapshot or None: Snapshot if the user exists, None otherwise
+    """
+    ttl = current_app.config['USER_CACHE_TTL']
+    now = time.monotonic()
+    if ttl > 0:
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        invalidate_user(user_id)
+        return None
+
+    snapshot = UserSnapshot(user)
+    if ttl > 0:
+        with _user_cache_lock:
+            if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                for key in [key for key, (expires, _) in _user_cache.items() if expires <= now] or list(_user_cache):
+                    del _user_cache[key]
+            _user_cache[user_id] = (now + ttl, snapshot)
+    return snapshot
+
+def invalidate_user(user_id):
+    """Drop a user from this process's login cache so the next request reloads it"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
 def verify_user(username, password):
     """
     Verify user credentials.
@@ -92,6 +159,7 @@ def change_password(user, current_password, new_password):
     
     try:
         db.session.commit()
+        invalidate_user(user.id)
         return True, "Password changed successfully"
     except Exception as e:
         db.session.rollback()
@@ -114,12 +182,35 @@ def reset_password(user, new_password):
     
     try:
         db.session.commit()
+        invalidate_user(user.id)
         return True, "Password reset successfully"
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error resetting password: {str(e)}")
         return False, f"Error resetting password: {str(e)}"
 
+def set_admin(user, is_admin):
+    """
+    Grant or revoke admin rights (admin function).
+    
+    Args:
+        user (User): User object
+        is_admin (bool): New admin status
+        
+    Returns:
+        (bool, str): Success status and message
+    """
+    user.is_admin = is_admin
+    
+    try:
+        db.session.commit()
+        invalidate_user(user.id)
+        return True, "Admin rights granted" if is_admin else "Admin rights revoked"
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error changing admin status: {str(e)}")
+        return False, f"Error changing admin status: {str(e)}"
+
 def get_user_by_id(user_id):
     """
     Get user by ID.
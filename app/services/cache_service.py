@@ -0,0 +1,363 @@
+"""
+Cache service for the HR Recruitment System.
+Stores GPT resume extractions keyed on the content they were computed from.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from ..cooperative import release_db_connection
+from ..models import ResumeCacheEntry, db
+from .gpt_service import process_resume_with_gpt, process_resumes_with_gpt, RESUME_PROMPT_VERSION
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+def resume_cache_key(cleaned_text, model, prompt_version):
+    """
+    Build the content-addressed cache key for a resume extraction.
+
+    Args:
+        cleaned_text (str): Cleaned resume text sent to GPT
+        model (str): GPT model name
+        prompt_version (str): Version of the extraction prompt
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{model}\0{prompt_version}\0'.encode('utf-8'))
+    digest.update(cleaned_text.encode('utf-8'))
+    return digest.hexdigest()
+
+# Rows deleted per eviction statement, and the share of RESUME_CACHE_MAX_BYTES eviction frees down to
+_EVICT_BATCH = 500
+_EVICT_TO = 0.9
+
+# Cache hits are written back in batches of this many keys, or after this many seconds
+_TOUCH_BATCH = 100
+_TOUCH_INTERVAL = 60
+
+class DatabaseResumeCache:
+    """
+    Resume cache stored in the resume_cache table.
+
+    Lookups only read. Hit counts and access times are buffered per process
+    and written back in batches on their own connection, so a lookup never
+    commits the caller's session. The cache size is tracked per process and
+    re-measured only when it passes RESUME_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._size = None
+        self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def get(self, key):
+        entry = db.session.get(ResumeCacheEntry, key)
+        if entry is None:
+            return None
+
+        result = dict(entry.result)
+        with self._lock:
+            hits, _ = self._touched.get(key, (0, None))
+            self._touched[key] = (hits + 1, datetime.utcnow())
+            due = len(self._touched) >= _TOUCH_BATCH or time.monotonic() - self._touched_at >= _TOUCH_INTERVAL
+        if due:
+            self._flush_touched()
+        return result
+
+    def _flush_touched(self):
+        """Write buffered hit counts and access times back in one transaction"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touched_at = time.monotonic()
+        if not touched:
+            return
+
+        statement = update(ResumeCacheEntry).where(ResumeCacheEntry.key == bindparam('b_key')).values(
+            hit_count=func.coalesce(ResumeCacheEntry.hit_count, 0) + bindparam('b_hits'),
+            last_accessed_at=bindparam('b_accessed_at')
+        ).execution_options(synchronize_session=False)
+        with db.engine.begin() as connection:
+            connection.execute(statement, [
+                {'b_key': key, 'b_hits': hits, 'b_accessed_at': accessed_at}
+                for key, (hits, accessed_at) in touched.items()
+            ])
+
+    def set(self, key, model, prompt_version, result):
+        payload = json.dumps(result)
+        inserted = db.session.execute(
+            insert(ResumeCacheEntry).values(
+                key=key,
+                model=model,
+                prompt_version=prompt_version,
+                result=result,
+                size_bytes=len(payload),
+                hit_count=0,
+                created_at=datetime.utcnow(),
+                last_accessed_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=['key']).returning(ResumeCacheEntry.size_bytes)
+        ).scalar()
+        db.session.commit()
+        if inserted is None:
+            return
+
+        max_bytes = current_app.config['RESUME_CACHE_MAX_BYTES']
+        with self._lock:
+            if self._size is not None:
+                self._size += inserted
+            over = self._size is None or self._size > max_bytes
+        if over:
+            self._evict(max_bytes)
+
+    def _evict(self, max_bytes):
+        """Delete least recently used rows in batches until the cache is under _EVICT_TO of max_bytes"""
+        # Other processes write too, so measure the real size before deleting anything
+        self._flush_touched()
+        total = db.session.execute(
+            select(func.coalesce(func.sum(ResumeCacheEntry.size_bytes), 0))
+        ).scalar()
+        db.session.commit()
+
+        target = max_bytes * _EVICT_TO
+        while total > target:
+            # Walks the last_accessed_at index a batch at a time and stops once enough is freed;
+            # SKIP LOCKED lets concurrent evictions split the work
+            freed = db.session.execute(text("""
+                DELETE FROM resume_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size_bytes) OVER (ORDER BY last_accessed_at, key) - size_bytes AS freed_before
+                        FROM (
+                            SELECT key, size_bytes, last_accessed_at FROM resume_cache
+                            ORDER BY last_accessed_at
+                            LIMIT :batch
+                            FOR UPDATE SKIP LOCKED
+                        ) oldest
+                    ) ranked
+                    WHERE freed_before < :excess
+                )
+                RETURNING size_bytes
+            """), {'batch': _EVICT_BATCH, 'excess': total - target}).scalars().all()
+            db.session.commit()
+            if not freed:
+                break
+            total -= sum(freed)
+
+        with self._lock:
+            self._size = total
+
+class DiskResumeCache:
+    """Resume cache stored as JSON files sharded by key prefix"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.json'):
+                        yield entry
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Touch the file so eviction treats it as recently used
+        os.utime(path)
+        return result
+
+    def set(self, key, model, prompt_version, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps(result)
+
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in self._entries())
+            else:
+                self._size += len(payload)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits max_bytes"""
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()),
+            reverse=True
+        )
+        total = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_bytes:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        self._size = total
+
+_database_cache = DatabaseResumeCache()
+_disk_caches = {}
+
+def get_resume_cache():
+    """
+    Get the configured resume cache backend.
+
+    Returns:
+        DatabaseResumeCache, DiskResumeCache or None if caching is disabled
+    """
+    backend = current_app.config['RESUME_CACHE_BACKEND']
+    if backend == 'database':
+        return _database_cache
+    if backend == 'disk':
+        directory = current_app.config['RESUME_CACHE_DIR']
+        if directory not in _disk_caches:
+            _disk_caches[directory] = DiskResumeCache(directory, current_app.config['RESUME_CACHE_MAX_BYTES'])
+        return _disk_caches[directory]
+    return None
+
+def _record(hit):
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+
+def get_cache_stats():
+    """
+    Get resume cache hit/miss counts for this process.
+
+    Returns:
+        dict: Hits, misses and hit rate
+    """
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0
+    }
+
+def _cache_get(cache, key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error reading resume cache: {e}")
+        return None
+
+def _cache_set(cache, key, model, candidate_data):
+    try:
+        cache.set(key, model, RESUME_PROMPT_VERSION, candidate_data)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error writing resume cache: {e}")
+
+def extract_candidate_data(cleaned_text):
+    """
+    Extract candidate data with GPT, reusing a cached result when possible.
+
+    Cache failures are logged and never block extraction. The session's
+    read transaction is ended before GPT is called, so callers must not
+    hold uncommitted work.
+
+    Args:
+        cleaned_text (str): Cleaned resume text
+
+    Returns:
+        (dict, bool): Candidate data (None if extraction failed) and whether it came from the cache
+    """
+    cache = get_resume_cache()
+    if cache is None:
+        release_db_connection()
+        return process_resume_with_gpt(cleaned_text), False
+
+    model = current_app.config['GPT_MODEL']
+    key = resume_cache_key(cleaned_text, model, RESUME_PROMPT_VERSION)
+
+    cached = _cache_get(cache, key)
+    if cached is not None:
+        _record(hit=True)
+        return cached, True
+
+    _record(hit=False)
+    # Hand the connection back to the pool while GPT answers
+    release_db_connection()
+    candidate_data = process_resume_with_gpt(cleaned_text)
+
+    if candidate_data:
+        _cache_set(cache, key, model, candidate_data)
+
+    return candidate_data, False
+
+def extract_candidates_data(resumes, pack_size=None):
+    """
+    Extract many resumes, packing the cache misses into shared GPT requests.
+
+    Identical texts are extracted once. Cache failures are logged and
+    never block extraction. The session's read transaction is ended
+    before GPT is called, so callers must not hold uncommitted work.
+
+    Args:
+        resumes (dict): Key -> cleaned resume text
+        pack_size (int): Most resumes per GPT request, defaults to GPT_RESUME_PACK_SIZE
+
+    Returns:
+        dict: Key -> candidate data (None if extraction failed)
+    """
+    cache = get_resume_cache()
+    model = current_app.config['GPT_MODEL']
+
+    results = {}
+    owners = {}
+    for key, cleaned_text in resumes.items():
+        if not cleaned_text:
+            results[key] = None
+        elif cleaned_text in owners:
+            owners[cleaned_text].append(key)
+        else:
+            owners[cleaned_text] = [key]
+
+    pending = {}
+    for cleaned_text, keys in owners.items():
+        cached = None
+        if cache is not None:
+            cached = _cache_get(cache, resume_cache_key(cleaned_text, model, RESUME_PROMPT_VERSION))
+            _record(hit=cached is not None)
+        if cached is not None:
+            results.update(dict.fromkeys(keys, cached))
+        else:
+            pending[keys[0]] = cleaned_text
+
+    if pending:
+        release_db_connection()
+    for key, candidate_data in process_resumes_with_gpt(pending, pack_size).items():
+        cleaned_text = pending[key]
+        results.update(dict.fromkeys(owners[cleaned_text], candidate_data))
+        if candidate_data and cache is not None:
+            _cache_set(cache, resume_cache_key(cleaned_text, model, RESUME_PROMPT_VERSION), model, candidate_data)
+
+    return results
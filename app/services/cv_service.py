@@ -1,59 +1,132 @@
 import os
 import PyPDF2
-from werkzeug.utils import secure_filename
 from flask import current_app
-import uuid
 import re
+import time
+from collections import namedtuple
+from .storage_service import store_resume_stream
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s@.+-]')
 
 def allowed_file(filename):
     """Check if file has PDF extension"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() == 'pdf'
 
 def save_resume(file):
-    """Save uploaded resume to disk with unique filename"""
+    """Store an uploaded resume by content hash, so identical uploads share one file"""
     if not file or not allowed_file(file.filename):
         return None
     
-    # Create a unique filename to prevent collisions
-    original_filename = secure_filename(file.filename)
-    filename = f"{uuid.uuid4()}_{original_filename}"
-    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-    
     try:
-        file.save(file_path)
-        return file_path
+        return store_resume_stream(file.stream)
     except Exception as e:
         current_app.logger.error(f"Error saving file: {e}")
         return None
 
-def extract_text_from_pdf(file_path):
-    """Extract all text from PDF file"""
+def store_resume_file(source_path):
+    """Store a resume from disk by content hash"""
+    if not allowed_file(source_path):
+        return None
+    
+    try:
+        with open(source_path, 'rb') as source:
+            return store_resume_stream(source)
+    except Exception as e:
+        current_app.logger.error(f"Error storing file: {e}")
+        return None
+
+PageText = namedtuple('PageText', ['number', 'text', 'seconds', 'skipped'])
+
+def _is_image_only(page):
+    """
+    True if a page draws only images and has no fonts, i.e. no extractable text.
+
+    Form XObjects carry their own resources and often hold the text of
+    generated or exported PDFs, so any Form keeps the page for extract_text().
+    """
+    resources = page.get('/Resources')
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if resources.get('/Font'):
+        return False
+    xobjects = resources.get('/XObject')
+    if not xobjects:
+        return False
+    xobjects = xobjects.get_object()
+    return all(xobjects[name].get_object().get('/Subtype') == '/Image' for name in xobjects)
+
+def iter_pdf_pages(file_path, max_chars=None):
+    """
+    Stream text from a PDF page by page.
+
+    Image-only pages are skipped without running text extraction, and
+    iteration stops once max_chars characters have been produced.
+
+    Args:
+        file_path (str): Path of the PDF
+        max_chars (int): Character budget, None or 0 for no limit
+
+    Yields:
+        PageText: Page number, text, extraction time in seconds and whether the page was skipped
+    """
+    remaining = max_chars or None
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for number, page in enumerate(reader.pages, 1):
+            started = time.perf_counter()
+            if _is_image_only(page):
+                yield PageText(number, '', time.perf_counter() - started, True)
+                continue
+            
+            page_text = page.extract_text() or ''
+            if remaining is not None:
+                page_text = page_text[:remaining]
+                remaining -= len(page_text)
+            yield PageText(number, page_text, time.perf_counter() - started, False)
+            
+            if remaining is not None and remaining <= 0:
+                break
+
+def read_pdf_text(file_path, max_chars=None, page_timings=None):
+    """
+    Extract text from PDF file, raising on errors (safe to run outside an app context)
+    
+    Args:
+        file_path (str): Path of the PDF
+        max_chars (int): Character budget, None or 0 for no limit
+        page_timings (list): If given, a PageText without text is appended per page for profiling
+    """
+    parts = []
+    for page in iter_pdf_pages(file_path, max_chars):
+        if page.text:
+            parts.append(page.text)
+        if page_timings is not None:
+            page_timings.append(page._replace(text=None))
+    return "\n".join(parts) + "\n" if parts else ""
+
+def extract_text_from_pdf(file_path, max_chars=None, page_timings=None):
+    """Extract text from PDF file up to PDF_TEXT_MAX_CHARS characters"""
     if not file_path or not os.path.exists(file_path):
         return ""
     
-    text = ""
+    if max_chars is None:
+        max_chars = current_app.config['PDF_TEXT_MAX_CHARS']
+    
     try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        return read_pdf_text(file_path, max_chars, page_timings)
     except Exception as e:
         current_app.logger.error(f"Error extracting text from PDF: {e}")
         return ""
-    
-    return text
 
 def extract_contact_info(text):
     """Extract basic contact information from text"""
-    # Basic patterns for email and phone
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    phone_pattern = r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}'
-    
     # Extract email and phone
-    email = re.search(email_pattern, text)
-    phone = re.search(phone_pattern, text)
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
     
     return {
         'email': email.group(0) if email else None,
@@ -63,7 +136,7 @@ def extract_contact_info(text):
 def clean_text(text):
     """Clean extracted text for better processing"""
     # Replace multiple whitespace with single space
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     # Remove special characters
-    text = re.sub(r'[^\w\s@.+-]', ' ', text)
+    text = SPECIAL_CHARS_PATTERN.sub(' ', text)
     return text.strip()
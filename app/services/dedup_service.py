@@ -0,0 +1,328 @@
+"""
+Duplicate detection service for the HR Recruitment System.
+Finds near-duplicate candidates with MinHash signatures and an LSH band index.
+"""
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.orm import load_only
+from ..models import Candidate, candidate_lsh_bands, db
+
+# 32 bands of 4 rows: pairs above ~0.42 similarity usually share a band
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+
+# Extra "bands" whose bucket is an exact name or phone key
+NAME_BAND = -1
+PHONE_BAND = -2
+
+PHONE_KEY_DIGITS = 9  # Trailing digits compared, so +27 82 ... and 082 ... agree
+
+# Fixed permutations (a * x + b) mod p; changing the seed invalidates stored signatures
+_PRIME = 4294967291  # Largest prime below 2**32, so a * x + b fits in uint64
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, NUM_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, NUM_PERMUTATIONS).astype(np.uint64)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+NAME_TOKEN_PATTERN = re.compile(r'[a-z]+')
+
+def duplicate_document(profile):
+    """Profile text compared between candidates (contact details are matched separately)"""
+    return ' '.join([
+        profile.get('experience') or '',
+        profile.get('education') or '',
+        ' '.join(profile.get('skills') or []),
+        ' '.join(profile.get('certifications') or []),
+        profile.get('industry') or '',
+        profile.get('experience_level') or '',
+    ])
+
+def _hash32(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=4).digest(), 'little')
+
+def _hash64(data):
+    """Signed 64-bit hash for a BIGINT bucket"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True)
+
+def minhash_signature(document):
+    """
+    Compute the MinHash signature of a document's word 3-gram shingles.
+
+    Args:
+        document (str): Text to sign
+
+    Returns:
+        numpy.ndarray: uint32 signature, or None if the text has no words
+    """
+    words = TOKEN_PATTERN.findall(document.lower()) if document else []
+    if not words:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((_hash32(shingle) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+def signature_similarity(first, second):
+    """Estimated Jaccard similarity of two signatures (0 if either is missing)"""
+    if first is None or second is None:
+        return 0.0
+    return float(np.mean(first == second))
+
+def name_key(name):
+    """Accent-folded, lowercased name tokens in sorted order; None for single-word names"""
+    folded = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    tokens = sorted(NAME_TOKEN_PATTERN.findall(folded.lower()))
+    return ' '.join(tokens) if len(tokens) >= 2 else None
+
+def phone_key(phone):
+    """Trailing digits of a phone number, None if it is too short to compare"""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-PHONE_KEY_DIGITS:] if len(digits) >= PHONE_KEY_DIGITS else None
+
+def _band_keys(signature, profile):
+    """(band, bucket) pairs under which a candidate is indexed"""
+    keys = []
+    if signature is not None:
+        for band in range(BANDS):
+            rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            keys.append((band, _hash64(rows.tobytes())))
+    name = name_key(profile.get('name'))
+    if name:
+        keys.append((NAME_BAND, _hash64(name.encode('utf-8'))))
+    phone = phone_key(profile.get('phone'))
+    if phone:
+        keys.append((PHONE_BAND, _hash64(phone.encode('utf-8'))))
+    return keys
+
+def index_candidates(candidates):
+    """
+    Store MinHash signatures and LSH buckets for candidates; the caller commits.
+
+    Args:
+        candidates (list): (candidate_id, profile dict) pairs
+    """
+    if not candidates:
+        return
+
+    signatures = []
+    bands = []
+    for candidate_id, profile in candidates:
+        signature = minhash_signature(duplicate_document(profile))
+        signatures.append((candidate_id, signature.tobytes() if signature is not None else None))
+        bands.extend((band, bucket, candidate_id) for band, bucket in _band_keys(signature, profile))
+
+    # Set-based statements: the statement-level candidate_stats triggers run
+    # once per batch, and no per-row parameters need compiling
+    db.session.execute(text("""
+        UPDATE candidates SET minhash = signatures.signature
+        FROM unnest(CAST(:ids AS integer[]), CAST(:signatures AS bytea[])) AS signatures(candidate_id, signature)
+        WHERE candidates.id = signatures.candidate_id
+    """), {'ids': [row[0] for row in signatures], 'signatures': [row[1] for row in signatures]})
+
+    ids = [candidate_id for candidate_id, _ in candidates]
+    db.session.execute(delete(candidate_lsh_bands).where(candidate_lsh_bands.c.candidate_id.in_(ids)))
+    if bands:
+        db.session.execute(text("""
+            INSERT INTO candidate_lsh_bands (band, bucket, candidate_id)
+            SELECT * FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[]), CAST(:ids AS integer[]))
+            ON CONFLICT DO NOTHING
+        """), {
+            'bands': [row[0] for row in bands],
+            'buckets': [row[1] for row in bands],
+            'ids': [row[2] for row in bands],
+        })
+
+def _is_duplicate(similarity, same_name, same_phone, threshold):
+    """
+    Text alone must be very similar; a matching name or phone halves the bar.
+
+    Works on scalars and elementwise on numpy arrays.
+    """
+    return (
+        (same_name & same_phone)
+        | ((same_name | same_phone) & (similarity >= threshold / 2))
+        | (similarity >= threshold)
+    )
+
+def _stored_signature(candidate):
+    return np.frombuffer(candidate.minhash, dtype=np.uint32) if candidate.minhash else None
+
+def _match_keys(signature, name, phone):
+    """What two candidates are compared on: (signature, name key, phone key)"""
+    return signature, name_key(name), phone_key(phone)
+
+def _compare(first, second, threshold):
+    """Match details for two _match_keys tuples, or None if they are not duplicates"""
+    similarity = signature_similarity(first[0], second[0])
+    same_name = first[1] is not None and first[1] == second[1]
+    same_phone = first[2] is not None and first[2] == second[2]
+    if not _is_duplicate(similarity, same_name, same_phone, threshold):
+        return None
+    return {'similarity': round(similarity, 3), 'same_name': same_name, 'same_phone': same_phone}
+
+# Summary columns plus what matching compares
+LOOKUP_COLUMNS = load_only(
+    Candidate.id, Candidate.name, Candidate.email, Candidate.phone, Candidate.skills, Candidate.experience_level,
+    Candidate.industry, Candidate.certifications, Candidate.created_at, Candidate.minhash
+)
+
+def find_duplicates(profile, exclude_id=None, limit=5):
+    """
+    Find saved candidates that look like the same person.
+
+    Only candidates sharing an LSH bucket with the profile are compared,
+    so the cost depends on the number of near matches, not the table size.
+
+    Args:
+        profile (dict): Candidate data about to be saved
+        exclude_id (int): Candidate to leave out (the profile's own row)
+        limit (int): Maximum number of matches
+
+    Returns:
+        list: Dicts with the candidate summary, similarity, same_name and same_phone, most similar first
+    """
+    signature = minhash_signature(duplicate_document(profile))
+    keys = _band_keys(signature, profile)
+    if not keys:
+        return []
+
+    # Oversized buckets (very common names, boilerplate text) say little and cost a lot
+    hits = (
+        select(
+            candidate_lsh_bands.c.candidate_id,
+            db.func.count().over(partition_by=(candidate_lsh_bands.c.band, candidate_lsh_bands.c.bucket)).label('size')
+        )
+        .where(tuple_(candidate_lsh_bands.c.band, candidate_lsh_bands.c.bucket).in_(keys))
+        .subquery()
+    )
+    query = select(hits.c.candidate_id).where(hits.c.size <= current_app.config['DEDUP_MAX_BUCKET_SIZE'])
+    if exclude_id is not None:
+        query = query.where(hits.c.candidate_id != exclude_id)
+    ids = set(db.session.execute(query).scalars())
+    if not ids:
+        return []
+
+    threshold = current_app.config['DEDUP_SIMILARITY']
+    keys = _match_keys(signature, profile.get('name'), profile.get('phone'))
+    matches = []
+    for candidate in Candidate.query.options(LOOKUP_COLUMNS).filter(Candidate.id.in_(ids)):
+        match = _compare(keys, _match_keys(_stored_signature(candidate), candidate.name, candidate.phone), threshold)
+        if match:
+            matches.append(dict(match, candidate=candidate.to_summary_dict()))
+    matches.sort(key=lambda match: (match['same_name'] and match['same_phone'], match['similarity']), reverse=True)
+    return matches[:limit]
+
+def index_missing_candidates(reindex=False, batch_size=500):
+    """
+    Index candidates saved before duplicate detection (or all with reindex).
+
+    Returns:
+        int: Number of candidates indexed
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        query = Candidate.query.filter(Candidate.id > last_id)
+        if not reindex:
+            query = query.filter(Candidate.minhash.is_(None))
+        batch = query.order_by(Candidate.id).limit(batch_size).all()
+        if not batch:
+            break
+        index_candidates([(candidate.id, candidate.to_dict()) for candidate in batch])
+        db.session.commit()
+        indexed += len(batch)
+        last_id = batch[-1].id
+    return indexed
+
+def find_duplicate_clusters(batch_size=1000, pair_chunk_size=20000):
+    """
+    Group all indexed candidates into clusters of likely duplicates.
+
+    Candidate pairs come from shared LSH buckets (one self-join on the band
+    index), are verified with the same rules as find_duplicates (vectorised
+    over chunks of pairs), and are merged transitively.
+
+    Returns:
+        list: Clusters as lists of candidate summaries with 'similarity' to the cluster's first member, largest first
+    """
+    pairs = db.session.execute(text("""
+        SELECT DISTINCT a.candidate_id, b.candidate_id
+        FROM candidate_lsh_bands a
+        JOIN candidate_lsh_bands b
+          ON b.band = a.band AND b.bucket = a.bucket AND b.candidate_id > a.candidate_id
+        WHERE (a.band, a.bucket) IN (
+            SELECT band, bucket FROM candidate_lsh_bands
+            GROUP BY band, bucket
+            HAVING COUNT(*) BETWEEN 2 AND :max_bucket_size
+        )
+    """), {'max_bucket_size': current_app.config['DEDUP_MAX_BUCKET_SIZE']}).all()
+    if not pairs:
+        return []
+
+    # Matching inputs as arrays indexed by position in ids; -1 = no name/phone key
+    ids = sorted({candidate_id for pair in pairs for candidate_id in pair})
+    position = {candidate_id: index for index, candidate_id in enumerate(ids)}
+    signatures = np.zeros((len(ids), NUM_PERMUTATIONS), dtype=np.uint32)
+    signed = np.zeros(len(ids), dtype=bool)
+    name_codes = np.full(len(ids), -1)
+    phone_codes = np.full(len(ids), -1)
+    codes = {}
+    candidates = {}
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        for candidate in Candidate.query.options(LOOKUP_COLUMNS).filter(Candidate.id.in_(chunk)):
+            index = position[candidate.id]
+            candidates[candidate.id] = candidate
+            signature, name, phone = _match_keys(_stored_signature(candidate), candidate.name, candidate.phone)
+            if signature is not None:
+                signatures[index] = signature
+                signed[index] = True
+            if name:
+                name_codes[index] = codes.setdefault(('name', name), len(codes))
+            if phone:
+                phone_codes[index] = codes.setdefault(('phone', phone), len(codes))
+
+    # Union-find over verified pairs
+    parent = {}
+    def find(index):
+        parent.setdefault(index, index)
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    threshold = current_app.config['DEDUP_SIMILARITY']
+    pair_positions = np.array([(position[a], position[b]) for a, b in pairs], dtype=np.int64)
+    for start in range(0, len(pair_positions), pair_chunk_size):
+        chunk = pair_positions[start:start + pair_chunk_size]
+        first, second = chunk[:, 0], chunk[:, 1]
+        similarity = (signatures[first] == signatures[second]).mean(axis=1) * (signed[first] & signed[second])
+        same_name = (name_codes[first] >= 0) & (name_codes[first] == name_codes[second])
+        same_phone = (phone_codes[first] >= 0) & (phone_codes[first] == phone_codes[second])
+        for first_index, second_index in chunk[_is_duplicate(similarity, same_name, same_phone, threshold)]:
+            parent[find(int(second_index))] = find(int(first_index))
+
+    groups = {}
+    for index in parent:
+        groups.setdefault(find(index), []).append(index)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        head = members[0]
+        cluster = []
+        for index in members:
+            candidate = candidates[ids[index]]
+            similarity = signature_similarity(signatures[head], signatures[index]) if signed[head] and signed[index] else 0.0
+            cluster.append(dict(candidate.to_summary_dict(), phone=candidate.phone, similarity=round(similarity, 3)))
+        clusters.append(cluster)
+    clusters.sort(key=len, reverse=True)
+    return clusters
@@ -0,0 +1,219 @@
+"""
+Embedding service for the HR Recruitment System.
+Computes compact local vectors for candidates and shortlists them for job matching.
+"""
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from ..models import Candidate, db
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+def _tokenize(text):
+    """Lowercase word tokens with adjacent-word bigrams"""
+    words = TOKEN_PATTERN.findall(text.lower()) if text else []
+    bigrams = [f'{a}_{b}' for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+def _bucket(token, dimensions):
+    """Map a token to a (column, sign) pair with a stable hash"""
+    digest = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest % dimensions, 1.0 if digest >> 63 else -1.0
+
+def _join(values):
+    return ' '.join(v for v in (values or []) if v)
+
+def candidate_document(profile):
+    """
+    Build the text used to embed a candidate.
+
+    Skills and certifications are repeated so they weigh more than free text.
+
+    Args:
+        profile (dict): Candidate data (request payload or Candidate.to_dict())
+
+    Returns:
+        str: Text to embed
+    """
+    skills = _join(profile.get('skills'))
+    certifications = _join(profile.get('certifications'))
+    return '\n'.join([
+        skills, skills,
+        certifications, certifications,
+        profile.get('experience_level') or '',
+        profile.get('industry') or '',
+        profile.get('education') or '',
+        profile.get('experience') or '',
+    ])
+
+def embed_text(text, dimensions=None):
+    """
+    Compute a hashed, sublinear term-frequency vector for text.
+
+    IDF weighting is applied at query time by CandidateIndex so stored
+    vectors do not go stale as the corpus grows.
+
+    Args:
+        text (str): Text to embed
+        dimensions (int): Vector size, defaults to EMBEDDING_DIMENSIONS
+
+    Returns:
+        numpy.ndarray: L2-normalised float32 vector
+    """
+    dimensions = dimensions or current_app.config['EMBEDDING_DIMENSIONS']
+    vector = np.zeros(dimensions, dtype=np.float32)
+
+    for token, count in Counter(_tokenize(text)).items():
+        column, sign = _bucket(token, dimensions)
+        vector[column] += sign * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+def compute_candidate_embedding(profile):
+    """
+    Compute the stored embedding for a candidate.
+
+    Args:
+        profile (dict): Candidate data
+
+    Returns:
+        bytes: float32 vector suitable for Candidate.embedding
+    """
+    return embed_text(candidate_document(profile)).tobytes()
+
+class CandidateIndex:
+    """In-process matrix of candidate embeddings used for cosine shortlisting"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = None
+        self._idf = None
+        self._signature = None
+
+    def _current_signature(self):
+        """Cheap fingerprint of the candidate table used to detect changes"""
+        count, last_update = db.session.query(
+            func.count(Candidate.id),
+            func.max(Candidate.updated_at)
+        ).one()
+        return count, last_update
+
+    def _load(self, dimensions):
+        """Load stored embeddings, embedding rows that predate the column in memory"""
+        ids = []
+        buffers = []
+        expected_size = dimensions * 4
+
+        rows = db.session.query(Candidate.id, Candidate.embedding).filter(
+            Candidate.embedding.isnot(None)
+        ).yield_per(5000)
+        for candidate_id, embedding in rows:
+            if len(embedding) == expected_size:
+                ids.append(candidate_id)
+                buffers.append(bytes(embedding))
+
+        # Rows saved before embeddings existed (or with another dimension)
+        # are embedded on the fly until `flask reindex-embeddings` is run
+        stale = Candidate.query.options(load_only(
+            Candidate.id, Candidate.skills, Candidate.certifications,
+            Candidate.experience_level, Candidate.industry,
+            Candidate.education, Candidate.experience
+        )).filter(
+            (Candidate.embedding.is_(None)) |
+            (func.length(Candidate.embedding) != expected_size)
+        ).yield_per(1000)
+        stale_count = 0
+        for candidate in stale:
+            ids.append(candidate.id)
+            buffers.append(compute_candidate_embedding(candidate.to_dict()))
+            stale_count += 1
+        if stale_count:
+            current_app.logger.warning(
+                f"{stale_count} candidates have no stored embedding; run `flask reindex-embeddings`"
+            )
+
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, dimensions), dtype=np.float32), None
+
+        matrix = np.frombuffer(b''.join(buffers), dtype=np.float32).reshape(len(ids), dimensions)
+
+        # Smoothed IDF over hashed columns, folded into the matrix once per load
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1.0 + len(ids)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        weighted = matrix * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        weighted /= norms
+
+        return np.asarray(ids, dtype=np.int64), weighted, idf
+
+    def refresh(self, force=False):
+        """Reload the index if the candidate table changed since the last load"""
+        signature = self._current_signature()
+        with self._lock:
+            if not force and signature == self._signature and self._matrix is not None:
+                return
+            dimensions = current_app.config['EMBEDDING_DIMENSIONS']
+            self._ids, self._matrix, self._idf = self._load(dimensions)
+            self._signature = signature
+
+    def search(self, text, top_k):
+        """
+        Find the candidates most similar to text.
+
+        Args:
+            text (str): Query text, e.g. job requirements
+            top_k (int): Number of candidates to return
+
+        Returns:
+            list: (candidate_id, similarity) tuples, best first
+        """
+        self.refresh()
+        with self._lock:
+            ids, matrix, idf = self._ids, self._matrix, self._idf
+
+        if ids.size == 0:
+            return []
+
+        query = embed_text(text, matrix.shape[1]) * idf
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query /= norm
+
+        scores = matrix @ query
+        top_k = min(top_k, ids.size)
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+candidate_index = CandidateIndex()
+
+def shortlist_candidates(job_requirements, top_k=None):
+    """
+    Select the candidates most relevant to a job before GPT ranking.
+
+    Args:
+        job_requirements (str): Job requirements description
+        top_k (int): Shortlist size, defaults to MATCH_SHORTLIST_SIZE
+
+    Returns:
+        list: Candidate IDs ordered by similarity
+    """
+    if not job_requirements:
+        return []
+
+    top_k = top_k or current_app.config['MATCH_SHORTLIST_SIZE']
+    return [candidate_id for candidate_id, _ in candidate_index.search(job_requirements, top_k)]
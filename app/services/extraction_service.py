@@ -0,0 +1,326 @@
+"""
+Rule-based extraction service for the HR Recruitment System.
+Reads candidate fields from CV text locally and scores how complete the result is.
+"""
+import re
+from datetime import date
+
+from .cv_service import EMAIL_PATTERN
+from .taxonomy_service import SKILL_SYNONYMS, CERTIFICATION_SYNONYMS, normalize_skills, normalize_certifications
+
+# Skills recognised besides the taxonomy synonyms (matched case-insensitively on word boundaries)
+SKILL_TERMS = [
+    'Python', 'Java', 'C++', 'C#', 'JavaScript', 'TypeScript', 'SQL', 'R', 'VBA', 'Excel', 'Power BI',
+    'Tableau', 'SAP', 'Pastel', 'Sage', 'Xero', 'QuickBooks', 'IFRS', 'GAAP', 'Auditing', 'Tax',
+    'Budgeting', 'Forecasting', 'Financial Modelling', 'Financial Reporting', 'Management Accounts',
+    'Reconciliations', 'Payroll', 'Treasury', 'Risk Management', 'Project Management', 'Agile', 'Scrum',
+    'AWS', 'Azure', 'Google Cloud', 'Docker', 'Kubernetes', 'Linux', 'Git', 'React', 'Angular',
+    'Django', 'Flask', 'Node.js', 'PostgreSQL', 'MySQL', 'SQL Server', 'Machine Learning',
+]
+
+# Lowercased keyword -> industry; the most frequent industry wins
+INDUSTRY_KEYWORDS = {
+    'bank': 'Banking', 'banking': 'Banking', 'credit': 'Banking', 'lending': 'Banking',
+    'audit': 'Finance', 'accounting': 'Finance', 'finance': 'Finance', 'financial': 'Finance',
+    'insurance': 'Insurance', 'actuarial': 'Insurance', 'underwriting': 'Insurance',
+    'software': 'Technology', 'developer': 'Technology', 'engineering': 'Technology', 'cloud': 'Technology',
+    'retail': 'Retail', 'store': 'Retail', 'mining': 'Mining', 'mine': 'Mining',
+    'consulting': 'Consulting', 'advisory': 'Consulting', 'hospital': 'Healthcare', 'healthcare': 'Healthcare',
+}
+
+# Field weights for the confidence score; they sum to 1
+FIELD_WEIGHTS = {
+    'name': 0.25,
+    'email': 0.2,
+    'phone': 0.1,
+    'skills': 0.2,
+    'education': 0.1,
+    'experience_level': 0.1,
+    'age': 0.05,
+}
+SKILLS_FOR_FULL_SCORE = 5
+
+NAME_HEADERS = {'curriculum vitae', 'resume', 'cv', 'personal details', 'profile', 'contact'}
+NAME_LINE = re.compile(r"^[A-Z][A-Za-z'\-]+(?: (?:[A-Z][A-Za-z'\-]+|van|der|de|du|le|von)){1,3}$")
+DEGREE_PATTERN = re.compile(
+    r"\b(bachelor|b\.?com|b\.?sc|b\.?a|b\.?acc|b\.?eng|ll\.?b|honours|hons|master|m\.?sc|m\.?com|mba|"
+    r"ph\.?d|doctorate|degree|diploma|graduated|university)\b", re.IGNORECASE
+)
+SCHOOL_PATTERN = re.compile(r'\b(matric|matriculated|grade 12|high school|nsc)\b', re.IGNORECASE)
+YEAR_PATTERN = re.compile(r'\b(19[5-9]\d|20\d\d)\b')
+AGE_PATTERN = re.compile(r'\bage\s*[:\-]?\s*(\d{2})\b', re.IGNORECASE)
+BIRTH_PATTERN = re.compile(r'\b(?:date of birth|d\.?o\.?b\.?|born)\b[^\n]*?\b(19[4-9]\d|200\d)\b', re.IGNORECASE)
+YEARS_EXPERIENCE_PATTERN = re.compile(r'\b(\d{1,2})\+?\s*(?:years|yrs)\b[^\n.]{0,30}\bexperience\b', re.IGNORECASE)
+DATE_RANGE_PATTERN = re.compile(
+    r'\b(19[5-9]\d|20\d\d)\s*(?:-|–|—|to)\s*(19[5-9]\d|20\d\d|present|current|now|date)\b', re.IGNORECASE
+)
+WORD_PATTERN = re.compile(r'[a-z]+')
+# International and local formats: +27 82 555 1234, (011) 555-1234, 082.555.1234
+PHONE_PATTERN = re.compile(r'(?<![\w+])\+?\(?\d[\d ().-]{7,18}\d(?!\w)')
+PHONE_DIGITS = (9, 15)
+
+# Typical age at the end of school and of a first degree
+SCHOOL_LEAVING_AGE = 18
+GRADUATION_AGE = 22
+
+def _term_pattern(terms, flags=0):
+    """Alternation of terms that only matches whole words, longest first"""
+    alternation = '|'.join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf'(?<![\w+#.])(?:{alternation})(?![\w+#])', flags)
+
+# Short aliases (js, ml, ca ...) match ordinary words too often to be used unsupervised
+_SKILL_PATTERN = _term_pattern(
+    [term for term in SKILL_SYNONYMS if len(term) > 2] + [term for term in SKILL_TERMS if len(term) > 1],
+    re.IGNORECASE
+)
+# Single letters (R) are also currency amounts (R 450 000) and initials (J. R. Smith),
+# so they only count in a skills section or as a list item next to another skill
+_SHORT_SKILL_PATTERN = _term_pattern([term for term in SKILL_TERMS if len(term) == 1])
+LIST_SEPARATORS = ',;|/'
+LIST_BULLETS = ('', '-', '*', '•', '·')
+SKILL_SECTION_HEADING = re.compile(r'^(key |technical |core |computer )?skills\s*:?$', re.IGNORECASE)
+
+# Acronyms must be upper case (CIMA, CA(SA)); spelled-out names match in any case.
+# Bare 2-3 letter acronyms (CA, CFA, PMP) are also US states, grades and initials,
+# so they only count with qualifying context on their line or in a certifications section.
+_SHORT_CERT_PATTERN = _term_pattern([term.upper() for term in CERTIFICATION_SYNONYMS if len(term) <= 3])
+_CERT_ACRONYM_PATTERN = _term_pattern([term.upper() for term in CERTIFICATION_SYNONYMS if 3 < len(term) <= 8])
+_CERT_NAME_PATTERN = _term_pattern([term for term in CERTIFICATION_SYNONYMS if len(term) > 8], re.IGNORECASE)
+CERT_CONTEXT_PATTERN = re.compile(
+    r'\b(qualified|certified|certification|certificate|charterholder|chartered|designation|member|'
+    r'membership|registered|admitted|passed|level [i1-3]{1,3})\b', re.IGNORECASE
+)
+CERT_SECTION_HEADING = re.compile(
+    r'^(professional )?(certifications?|qualifications?|memberships?|accreditations?|designations?|'
+    r'licen[cs]es?( (and|&) certifications?)?)\s*:?$', re.IGNORECASE
+)
+SECTION_HEADING = re.compile(
+    r'^(profile|summary|personal details|contact|(work |professional )?experience|employment( history)?|'
+    r'career history|education|(key |technical )?skills|languages|interests|hobbies|references|'
+    r'projects|achievements|awards)\s*:?$', re.IGNORECASE
+)
+
+_SKILL_DISPLAY = {term.lower(): term for term in SKILL_TERMS}
+
+def _lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def extract_phone(text):
+    """First phone-number-like run with a plausible digit count (skips date ranges and ID numbers)"""
+    for match in PHONE_PATTERN.finditer(text):
+        number = match.group(0).strip()
+        digits = sum(char.isdigit() for char in number)
+        if not PHONE_DIGITS[0] <= digits <= PHONE_DIGITS[1] or DATE_RANGE_PATTERN.search(number):
+            continue
+        # Long unbroken digit runs are ID or account numbers, not phones
+        if number.isdigit() and digits > 10:
+            continue
+        return number
+    return None
+
+def extract_name(lines):
+    """
+    Find the candidate name among the first lines of a CV.
+
+    Returns:
+        (str, float): Name (None if not found) and confidence in [0, 1]
+    """
+    for position, line in enumerate(lines[:6]):
+        if line.lower().rstrip(':') in NAME_HEADERS:
+            continue
+        if NAME_LINE.match(line):
+            return line, 1.0 if position == 0 else 0.7
+        # Names are usually the first content; stop once a long line shows up
+        if len(line) > 60:
+            break
+    return None, 0.0
+
+def _is_list_item(line, match):
+    """True if a match stands alone between list separators, bullets or the line ends"""
+    before, after = line[:match.start()].rstrip(), line[match.end():].lstrip()
+    listed_after = not after or after[0] in LIST_SEPARATORS
+    return listed_after and (before in LIST_BULLETS or before[-1] in LIST_SEPARATORS)
+
+def extract_skills(text):
+    """Dictionary-match skills in text and return them as canonical names"""
+    found = [match.group(0) for match in _SKILL_PATTERN.finditer(text)]
+
+    in_section = False
+    for line in _lines(text):
+        if SKILL_SECTION_HEADING.match(line):
+            in_section = True
+            continue
+        if SECTION_HEADING.match(line) or CERT_SECTION_HEADING.match(line):
+            in_section = False
+        for match in _SHORT_SKILL_PATTERN.finditer(line):
+            if in_section or (_is_list_item(line, match) and _SKILL_PATTERN.search(line)):
+                found.append(match.group(0))
+
+    found = [_SKILL_DISPLAY.get(term.lower(), term) for term in found]
+    return normalize_skills(found)
+
+def extract_certifications(text, lines):
+    """
+    Detect professional certifications (CA, CIMA, CFA ...) and return canonical names.
+
+    Returns:
+        (list, list): Certifications found, and bare short acronyms seen
+            without qualifying context (e.g. the "CA" in "Cape Town, CA")
+    """
+    found = [match.group(0) for match in _CERT_ACRONYM_PATTERN.finditer(text)]
+    found += [match.group(0) for match in _CERT_NAME_PATTERN.finditer(text)]
+
+    unconfirmed = []
+    in_section = False
+    for line in lines:
+        if CERT_SECTION_HEADING.match(line):
+            in_section = True
+            continue
+        if SECTION_HEADING.match(line):
+            in_section = False
+        for match in _SHORT_CERT_PATTERN.finditer(line):
+            if in_section or CERT_CONTEXT_PATTERN.search(line):
+                found.append(match.group(0))
+            else:
+                unconfirmed.append(match.group(0))
+
+    certifications = normalize_certifications(found)
+    unconfirmed = [cert for cert in normalize_certifications(unconfirmed) if cert not in certifications]
+    return certifications, unconfirmed
+
+def extract_education(lines):
+    """Education lines (degrees, diplomas, school), at most three"""
+    education = [line for line in lines if DEGREE_PATTERN.search(line) or SCHOOL_PATTERN.search(line)]
+    return '; '.join(education[:3])[:500] or None
+
+def estimate_age(text, lines, today=None):
+    """
+    Estimate age from a stated age, a birth year or the earliest graduation year.
+
+    Returns:
+        (int, float): Age (None if unknown) and confidence in [0, 1]
+    """
+    year = (today or date.today()).year
+
+    stated = AGE_PATTERN.search(text)
+    if stated and 16 <= int(stated.group(1)) <= 80:
+        return int(stated.group(1)), 1.0
+
+    born = BIRTH_PATTERN.search(text)
+    if born:
+        return year - int(born.group(1)), 1.0
+
+    # A first degree usually finishes around 22 and school around 18
+    estimates = []
+    for line in lines:
+        if DEGREE_PATTERN.search(line):
+            offset = GRADUATION_AGE
+        elif SCHOOL_PATTERN.search(line):
+            offset = SCHOOL_LEAVING_AGE
+        else:
+            continue
+        for match in YEAR_PATTERN.finditer(line):
+            if int(match.group(0)) <= year:
+                estimates.append(year - int(match.group(0)) + offset)
+    if estimates:
+        return max(estimates), 0.6
+    return None, 0.0
+
+def estimate_experience_level(text, lines, today=None):
+    """
+    Classify experience as Junior (< 3 years), Mid (< 8) or Senior.
+
+    Uses a stated "N years of experience" if present, otherwise the span
+    of employment date ranges outside education lines.
+
+    Returns:
+        (str, float): Level (None if unknown) and confidence in [0, 1]
+    """
+    year = (today or date.today()).year
+    stated = [int(match.group(1)) for match in YEARS_EXPERIENCE_PATTERN.finditer(text)]
+    if stated:
+        years, confidence = max(stated), 1.0
+    else:
+        spans = []
+        for line in lines:
+            if DEGREE_PATTERN.search(line) or SCHOOL_PATTERN.search(line):
+                continue
+            for start, end in DATE_RANGE_PATTERN.findall(line):
+                end = int(end) if end.isdigit() else year
+                if int(start) <= end <= year:
+                    spans.append((int(start), end))
+        if not spans:
+            return None, 0.0
+        years, confidence = max(end for _, end in spans) - min(start for start, _ in spans), 0.8
+
+    if years < 3:
+        return 'Junior', confidence
+    return ('Mid' if years < 8 else 'Senior'), confidence
+
+def guess_industry(text):
+    """Most frequently mentioned industry, if it is mentioned at least twice"""
+    counts = {}
+    for word in WORD_PATTERN.findall(text.lower()):
+        industry = INDUSTRY_KEYWORDS.get(word)
+        if industry:
+            counts[industry] = counts.get(industry, 0) + 1
+    if not counts:
+        return None
+    industry, count = max(counts.items(), key=lambda item: item[1])
+    return industry if count >= 2 else None
+
+def extract_with_rules(resume_text, today=None):
+    """
+    Extract candidate data from raw CV text without calling GPT.
+
+    Works on the text as extracted from the PDF (line breaks intact, not
+    clean_text output). The confidence is the weighted share of fields
+    found. Experience is never extracted, and certifications are left to
+    GPT when the only hits are bare acronyms without context; both are
+    listed as pending.
+
+    Args:
+        resume_text (str): Text extracted from the CV
+        today (date): Reference date for age and experience, defaults to today
+
+    Returns:
+        (dict, float, list): Candidate data in the GPT extraction format,
+            confidence in [0, 1] and the fields left for GPT
+    """
+    lines = _lines(resume_text)
+    email = EMAIL_PATTERN.search(resume_text)
+    phone = extract_phone(resume_text)
+    name, name_score = extract_name(lines)
+    skills = extract_skills(resume_text)
+    education = extract_education(lines)
+    age, age_score = estimate_age(resume_text, lines, today)
+    experience_level, level_score = estimate_experience_level(resume_text, lines, today)
+    certifications, unconfirmed_certifications = extract_certifications(resume_text, lines)
+    pending = ['experience']
+    if unconfirmed_certifications and not certifications:
+        pending.append('certifications')
+
+    data = {
+        'name': name,
+        'email': email.group(0) if email else None,
+        'phone': phone,
+        'skills': skills,
+        'experience': None,
+        'experience_level': experience_level,
+        'education': education,
+        'certifications': certifications,
+        'industry': guess_industry(resume_text),
+        'age': age,
+    }
+
+    scores = {
+        'name': name_score,
+        'email': 1.0 if email else 0.0,
+        'phone': 1.0 if phone else 0.0,
+        'skills': min(len(skills), SKILLS_FOR_FULL_SCORE) / SKILLS_FOR_FULL_SCORE,
+        'education': 1.0 if education else 0.0,
+        'experience_level': level_score,
+        'age': age_score,
+    }
+    confidence = sum(FIELD_WEIGHTS[field] * score for field, score in scores.items())
+    return data, round(confidence, 3), pending
@@ -1,7 +1,46 @@
 
 import json
-import openai
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from .openai_service import chat_completion
+from .prompt_service import estimate_tokens, estimate_message_tokens, truncate_to_tokens, fit_fields, check_budget
+from ..metrics import RESUME_PACK_RESULTS
+
+# Bump whenever RESUME_SYSTEM_PROMPT or RESUME_PACK_SYSTEM_PROMPT changes so cached extractions are not reused
+RESUME_PROMPT_VERSION = '1'
+
+RESUME_SYSTEM_PROMPT = """
+You are an expert HR recruiter assistant specialized in analyzing CVs/resumes.
+Extract the following information from the provided resume text:
+
+1. Full Name
+2. Email address
+3. Phone number
+4. Skills (as a list)
+5. Work experience and determine level (Junior, Mid, Senior)
+6. Education details
+7. Professional certifications (especially note CA, CIMA, or CFA)
+8. Main industry experience
+9. Approximate age (if provided or can be inferred from graduation dates)
+
+Format your response ONLY as a clean JSON object with the following structure:
+{
+    "name": "Full Name",
+    "email": "email@example.com",
+    "phone": "Phone number",
+    "skills": ["Skill 1", "Skill 2", "Skill 3"],
+    "experience": "Summary of experience",
+    "experience_level": "Junior/Mid/Senior",
+    "education": "Education details",
+    "certifications": ["Certification 1", "Certification 2"],
+    "industry": "Main industry",
+    "age": null or approximate age as integer
+}
+
+Make your best inference if information is not explicitly stated. 
+For certifications, look specifically for accounting/finance qualifications like CA, CIMA, or CFA.
+Include only the JSON in your response, no additional text.
+"""
 
 def process_resume_with_gpt(resume_text):
     """
@@ -16,27 +55,58 @@ def process_resume_with_gpt(resume_text):
     if not resume_text:
         return None
     
-    # Set OpenAI API key from configuration
-    openai.api_key = current_app.config['OPENAI_API_KEY']
-    
     try:
-        # Define the system prompt
-        system_prompt = """
-        You are an expert HR recruiter assistant specialized in analyzing CVs/resumes.
-        Extract the following information from the provided resume text:
+        # Trim the CV so system prompt and text fit the input budget
+        budget = current_app.config['GPT_RESUME_TOKEN_BUDGET']
+        available = budget - estimate_message_tokens([
+            {"role": "system", "content": RESUME_SYSTEM_PROMPT},
+            {"role": "user", "content": ""}
+        ])
+        messages = [
+            {"role": "system", "content": RESUME_SYSTEM_PROMPT},
+            {"role": "user", "content": truncate_to_tokens(resume_text, available)}
+        ]
+        estimated_tokens = check_budget(messages, budget)
         
-        1. Full Name
-        2. Email address
-        3. Phone number
-        4. Skills (as a list)
-        5. Work experience and determine level (Junior, Mid, Senior)
-        6. Education details
-        7. Professional certifications (especially note CA, CIMA, or CFA)
-        8. Main industry experience
-        9. Approximate age (if provided or can be inferred from graduation dates)
+        # Call OpenAI API through the shared, rate-limited client
+        response = chat_completion(
+            'resume',
+            messages,
+            estimated_tokens,
+            temperature=0.2,  # Lower temperature for more consistent results
+            response_format={"type": "json_object"}  # Ensure JSON response
+        )
+        
+        # Extract and parse the response
+        gpt_response = response.choices[0].message.content
+        candidate_data = json.loads(gpt_response)
+        
+        return candidate_data
         
-        Format your response ONLY as a clean JSON object with the following structure:
+    except Exception as e:
+        current_app.logger.error(f"Error processing with GPT: {e}")
+        return None
+
+RESUME_PACK_SYSTEM_PROMPT = """
+You are an expert HR recruiter assistant specialized in analyzing CVs/resumes.
+You will receive several resumes, each starting with a line "=== RESUME <id> ===".
+Extract the following information from EACH resume on its own, never mixing details between resumes:
+
+1. Full Name
+2. Email address
+3. Phone number
+4. Skills (as a list)
+5. Work experience and determine level (Junior, Mid, Senior)
+6. Education details
+7. Professional certifications (especially note CA, CIMA, or CFA)
+8. Main industry experience
+9. Approximate age (if provided or can be inferred from graduation dates)
+
+Format your response ONLY as a clean JSON object with one result per resume, in the order given:
+{
+    "results": [
         {
+            "id": "id from the resume's header line",
             "name": "Full Name",
             "email": "email@example.com",
             "phone": "Phone number",
@@ -48,40 +118,367 @@ def process_resume_with_gpt(resume_text):
             "industry": "Main industry",
             "age": null or approximate age as integer
         }
-        
-        Make your best inference if information is not explicitly stated. 
-        For certifications, look specifically for accounting/finance qualifications like CA, CIMA, or CFA.
-        Include only the JSON in your response, no additional text.
-        """
-        
-        # Call OpenAI API
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": resume_text}
-            ],
-            temperature=0.2,  # Lower temperature for more consistent results
-            response_format={"type": "json_object"}  # Ensure JSON response
+    ]
+}
+
+Make your best inference if information is not explicitly stated.
+For certifications, look specifically for accounting/finance qualifications like CA, CIMA, or CFA.
+Include only the JSON in your response, no additional text.
+"""
+
+# Header line and spacing added around each resume in a packed request
+PACK_HEADER_TOKENS = 12
+
+def _pack_header(pack_id):
+    return f"=== RESUME {pack_id} ==="
+
+def pack_resumes(resumes, pack_size=None):
+    """
+    Group resumes into packs that each fit one packed extraction request.
+
+    Packs are filled in order up to pack_size resumes and the
+    GPT_RESUME_PACK_TOKEN_BUDGET input budget. Resumes longer than
+    GPT_RESUME_PACK_MAX_CV_TOKENS get a pack of their own.
+
+    Args:
+        resumes (dict): Key -> cleaned resume text
+        pack_size (int): Most resumes per pack, defaults to GPT_RESUME_PACK_SIZE
+
+    Returns:
+        list: Dicts of key -> cleaned resume text, one per request
+    """
+    config = current_app.config
+    pack_size = pack_size or config['GPT_RESUME_PACK_SIZE']
+    max_cv_tokens = config['GPT_RESUME_PACK_MAX_CV_TOKENS']
+    available = config['GPT_RESUME_PACK_TOKEN_BUDGET'] - estimate_message_tokens([
+        {"role": "system", "content": RESUME_PACK_SYSTEM_PROMPT},
+        {"role": "user", "content": ""}
+    ])
+
+    packs = []
+    current, used = {}, 0
+    for key, text in resumes.items():
+        tokens = estimate_tokens(text) + PACK_HEADER_TOKENS
+        if pack_size <= 1 or tokens > min(max_cv_tokens, available):
+            packs.append({key: text})
+            continue
+        if current and (len(current) >= pack_size or used + tokens > available):
+            packs.append(current)
+            current, used = {}, 0
+        current[key] = text
+        used += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+def _valid_extraction(data, resume_text):
+    """
+    Check that a packed result is well-formed and belongs to its resume.
+
+    The name and email must be found in the resume text, which catches
+    results the model attributed to the wrong resume.
+    """
+    if not isinstance(data, dict):
+        return False
+    name = data.get('name')
+    if not isinstance(name, str) or not name.strip():
+        return False
+    for field in ('skills', 'certifications'):
+        if data.get(field) is not None and not isinstance(data[field], list):
+            return False
+
+    text = resume_text.lower()
+    email = data.get('email')
+    if email and (not isinstance(email, str) or email.lower() not in text):
+        return False
+    return any(part in text for part in name.lower().split() if len(part) > 1)
+
+def process_resume_pack_with_gpt(resumes):
+    """
+    Extract several resumes with one GPT request.
+
+    Each resume is sent under a short id and the response is a JSON array
+    keyed by those ids. Results that are missing or fail validation are
+    returned as None.
+
+    Args:
+        resumes (dict): Key -> cleaned resume text, as grouped by pack_resumes
+
+    Returns:
+        dict: Key -> structured candidate information (None if not extracted)
+    """
+    results = dict.fromkeys(resumes)
+    pack_ids = {str(index): key for index, key in enumerate(resumes, start=1)}
+
+    try:
+        content = '\n\n'.join(f"{_pack_header(pack_id)}\n{resumes[key]}" for pack_id, key in pack_ids.items())
+        messages = [
+            {"role": "system", "content": RESUME_PACK_SYSTEM_PROMPT},
+            {"role": "user", "content": content}
+        ]
+        estimated_tokens = check_budget(messages, current_app.config['GPT_RESUME_PACK_TOKEN_BUDGET'])
+
+        response = chat_completion(
+            'resume_pack',
+            messages,
+            estimated_tokens,
+            temperature=0.2,
+            response_format={"type": "json_object"}
         )
-        
-        # Extract and parse the response
-        gpt_response = response.choices[0].message.content
-        candidate_data = json.loads(gpt_response)
-        
-        return candidate_data
-        
+        items = json.loads(response.choices[0].message.content).get('results') or []
     except Exception as e:
-        current_app.logger.error(f"Error processing with GPT: {e}")
-        return None
+        current_app.logger.error(f"Error processing resume pack with GPT: {e}")
+        return results
+
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        pack_id = str(item.pop('id', ''))
+        key = pack_ids.get(pack_id)
+        # An id answered twice means the model lost track of the resumes
+        if key is None or pack_id in seen:
+            if key is not None:
+                results[key] = None
+            continue
+        seen.add(pack_id)
+        if _valid_extraction(item, resumes[key]):
+            results[key] = item
+    return results
+
+def process_resumes_with_gpt(resumes, pack_size=None):
+    """
+    Extract many resumes, packing short ones into shared GPT requests.
+
+    Sharing the system prompt and request overhead lowers tokens and
+    round-trips per resume. Any resume whose packed result is missing or
+    fails validation is re-run on its own with process_resume_with_gpt.
+
+    Args:
+        resumes (dict): Key -> cleaned resume text
+        pack_size (int): Most resumes per request, defaults to GPT_RESUME_PACK_SIZE
+
+    Returns:
+        dict: Key -> structured candidate information (None if extraction failed)
+    """
+    results = {}
+    for pack in pack_resumes(resumes, pack_size):
+        if len(pack) == 1:
+            key, text = next(iter(pack.items()))
+            results[key] = process_resume_with_gpt(text)
+            continue
+
+        extracted = process_resume_pack_with_gpt(pack)
+        rerun = [key for key, data in extracted.items() if data is None]
+        RESUME_PACK_RESULTS.inc(len(pack) - len(rerun), outcome='packed')
+        if rerun:
+            RESUME_PACK_RESULTS.inc(len(rerun), outcome='rerun')
+            current_app.logger.warning(f"Re-running {len(rerun)} of {len(pack)} packed resumes individually")
+        for key in rerun:
+            extracted[key] = process_resume_with_gpt(pack[key])
+        results.update(extracted)
+    return results
+
+RANKING_SYSTEM_PROMPT = """
+You are an expert HR recruiter specializing in candidate matching.
+You will receive job requirements followed by candidate profiles.
+Evaluate how well each candidate matches the job requirements on a scale of 0-100.
+Consider skills, experience level, education, certifications, and industry background.
+Focus particularly on relevant technical skills and domain knowledge.
+For finance roles, give higher importance to relevant certifications like CA, CIMA, or CFA.
+Return a JSON object with the candidate IDs and their match scores, sorted from highest to lowest score.
+Format: {"rankings": [{"id": candidate_id, "score": match_score}, ...]}
+"""
+
+def _format_candidate(c):
+    """
+    Render a candidate profile for the ranking prompt.
+    
+    Skills, certifications and the short fields are kept whole; experience,
+    then education, are truncated to keep the profile within GPT_RANK_PROFILE_TOKENS.
+    """
+    fields = fit_fields([
+        ('Candidate ID', str(c['id']), False),
+        ('Name', c['name'], False),
+        ('Skills', ', '.join(c['skills'] or []), False),
+        ('Certifications', ', '.join(c['certifications']) if c['certifications'] else 'None', False),
+        ('Experience Level', c['experience_level'], False),
+        ('Industry', c['industry'], False),
+        ('Education', c['education'], True),
+        ('Experience', c['experience'], True),
+    ], current_app.config['GPT_RANK_PROFILE_TOKENS'])
+    
+    return (
+        f"Candidate ID: {fields['Candidate ID']}\n" +
+        f"Name: {fields['Name']}\n" +
+        f"Skills: {fields['Skills']}\n" +
+        f"Experience: {fields['Experience']}\n" +
+        f"Experience Level: {fields['Experience Level']}\n" +
+        f"Education: {fields['Education']}\n" +
+        f"Certifications: {fields['Certifications']}\n" +
+        f"Industry: {fields['Industry']}"
+    )
+
+def _ranking_requirements(job_requirements):
+    """Job requirements trimmed to a quarter of the ranking budget"""
+    return truncate_to_tokens(job_requirements, current_app.config['GPT_RANK_TOKEN_BUDGET'] // 4)
+
+def _parse_rankings(content):
+    """Extract [{"id", "score"}] from a ranking response"""
+    result = json.loads(content)
+    if isinstance(result, dict):
+        result = result.get('rankings') or next(
+            (value for value in result.values() if isinstance(value, list)), []
+        )
+    scores = {}
+    for item in result:
+        if 'id' not in item or 'score' not in item:
+            continue
+        candidate_id = item['id']
+        if isinstance(candidate_id, str) and candidate_id.isdigit():
+            candidate_id = int(candidate_id)
+        scores[candidate_id] = float(item['score'])
+    return scores
+
+def _score_candidates(job_requirements, candidate_profiles):
+    """
+    Score one batch of candidates in a single GPT call.
+
+    Raises on API or parsing errors so callers can retry the batch.
+
+    Returns:
+        dict: Candidate ID -> match score
+    """
+    candidates_text = "\n\n".join(_format_candidate(c) for c in candidate_profiles)
+    prompt = f"Job Requirements:\n{_ranking_requirements(job_requirements)}\n\nCandidates:\n{candidates_text}"
+    messages = [
+        {"role": "system", "content": RANKING_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    estimated_tokens = check_budget(messages, current_app.config['GPT_RANK_TOKEN_BUDGET'])
+    
+    response = chat_completion(
+        'ranking',
+        messages,
+        estimated_tokens,
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+    
+    scores = _parse_rankings(response.choices[0].message.content)
+    
+    # Ignore IDs the model invented
+    valid_ids = {c['id'] for c in candidate_profiles}
+    return {candidate_id: score for candidate_id, score in scores.items() if candidate_id in valid_ids}
 
-def rank_candidates_for_job(job_requirements, candidate_profiles):
+def _chunk_profiles(job_requirements, candidate_profiles, token_budget):
+    """Split profiles into batches whose prompts fit the token budget"""
+    base_tokens = estimate_message_tokens([
+        {"role": "system", "content": RANKING_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Job Requirements:\n{_ranking_requirements(job_requirements)}\n\nCandidates:\n"}
+    ])
+    chunks = []
+    current = []
+    current_tokens = base_tokens
+    
+    for profile in candidate_profiles:
+        # Profiles are joined by a blank line
+        profile_tokens = estimate_tokens(_format_candidate(profile) + "\n\n")
+        if current and current_tokens + profile_tokens > token_budget:
+            chunks.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append(profile)
+        current_tokens += profile_tokens
+    
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _score_chunk(app, job_requirements, chunk, retries):
+    """Score a chunk in a worker thread, retrying it on its own on failure"""
+    with app.app_context():
+        for attempt in range(retries + 1):
+            try:
+                return _score_candidates(job_requirements, chunk)
+            except Exception as e:
+                app.logger.warning(
+                    f"Ranking chunk of {len(chunk)} failed (attempt {attempt + 1}/{retries + 1}): {e}"
+                )
+    return None
+
+def _rank_in_chunks(job_requirements, chunks):
+    """
+    Map-reduce ranking: score chunks concurrently, then calibrate across chunks.
+
+    The top candidates of every chunk are re-scored together in one call.
+    Each chunk's remaining candidates are shifted by the average correction
+    its leaders received, so scores from different chunks are comparable.
+    
+    Returns:
+        dict: Candidate ID -> calibrated score
+    """
+    app = current_app._get_current_object()
+    config = current_app.config
+    
+    with ThreadPoolExecutor(max_workers=config['GPT_RANK_MAX_WORKERS']) as executor:
+        chunk_scores = list(executor.map(
+            lambda chunk: _score_chunk(app, job_requirements, chunk, config['GPT_RANK_CHUNK_RETRIES']),
+            chunks
+        ))
+    
+    failed = sum(1 for scores in chunk_scores if scores is None)
+    if failed:
+        current_app.logger.error(f"{failed} of {len(chunks)} ranking chunks failed after retries")
+    chunk_scores = [scores for scores in chunk_scores if scores]
+    
+    # Pick each chunk's leaders for the calibration round
+    leaders_per_chunk = config['GPT_RANK_CALIBRATION_LEADERS']
+    chunk_leaders = [
+        sorted(scores, key=scores.get, reverse=True)[:leaders_per_chunk]
+        for scores in chunk_scores
+    ]
+    
+    merged = {}
+    for scores in chunk_scores:
+        merged.update(scores)
+    
+    if len(chunk_scores) < 2:
+        return merged
+    
+    # Take leaders rank by rank across chunks, as many as fit one call
+    profiles_by_id = {p['id']: p for chunk in chunks for p in chunk}
+    leader_profiles = [
+        profiles_by_id[leaders[position]]
+        for position in range(leaders_per_chunk)
+        for leaders in chunk_leaders if position < len(leaders)
+    ]
+    leader_profiles = _chunk_profiles(job_requirements, leader_profiles, config['GPT_RANK_TOKEN_BUDGET'])[0]
+    calibrated = _score_chunk(app, job_requirements, leader_profiles, config['GPT_RANK_CHUNK_RETRIES'])
+    if not calibrated:
+        current_app.logger.warning("Calibration round failed, using uncalibrated chunk scores")
+        return merged
+    
+    for scores, leaders in zip(chunk_scores, chunk_leaders):
+        corrections = [calibrated[i] - scores[i] for i in leaders if i in calibrated]
+        offset = sum(corrections) / len(corrections) if corrections else 0.0
+        for candidate_id, score in scores.items():
+            if candidate_id in calibrated:
+                merged[candidate_id] = calibrated[candidate_id]
+            else:
+                merged[candidate_id] = min(100.0, max(0.0, score + offset))
+    
+    return merged
+
+def rank_candidates_for_job(job_requirements, candidate_profiles, chunked=None):
     """
     Rank candidates based on job requirements using GPT
     
     Args:
         job_requirements (str): Job requirements description
         candidate_profiles (list): List of candidate profile dictionaries
+        chunked (bool): Force chunked ranking. Chunks are always used when
+            one prompt would exceed GPT_RANK_TOKEN_BUDGET.
         
     Returns:
         list: Ranked candidate profiles with score
@@ -89,58 +486,24 @@ def rank_candidates_for_job(job_requirements, candidate_profiles):
     if not job_requirements or not candidate_profiles:
         return []
     
-    openai.api_key = current_app.config['OPENAI_API_KEY']
-    
-    system_prompt = """
-    You are an expert HR recruiter specializing in candidate matching.
-    You will receive job requirements followed by candidate profiles.
-    Evaluate how well each candidate matches the job requirements on a scale of 0-100.
-    Consider skills, experience level, education, certifications, and industry background.
-    Focus particularly on relevant technical skills and domain knowledge.
-    For finance roles, give higher importance to relevant certifications like CA, CIMA, or CFA.
-    Return a JSON array of candidate IDs with their match scores, sorted from highest to lowest score.
-    Format: [{"id": candidate_id, "score": match_score}, ...]
-    """
-    
-    # Prepare candidate profiles for the prompt
-    candidates_text = "\n\n".join([
-        f"Candidate ID: {c['id']}\n" +
-        f"Name: {c['name']}\n" +
-        f"Skills: {', '.join(c['skills'])}\n" +
-        f"Experience: {c['experience']}\n" +
-        f"Experience Level: {c['experience_level']}\n" +
-        f"Education: {c['education']}\n" +
-        f"Certifications: {', '.join(c['certifications']) if c['certifications'] else 'None'}\n" +
-        f"Industry: {c['industry']}"
-        for c in candidate_profiles
-    ])
-    
-    prompt = f"Job Requirements:\n{job_requirements}\n\nCandidates:\n{candidates_text}"
+    chunks = _chunk_profiles(job_requirements, candidate_profiles, current_app.config['GPT_RANK_TOKEN_BUDGET'])
+    # Sets too large for one call are always chunked so no call exceeds the budget
+    chunked = bool(chunked) or len(chunks) > 1
     
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-        
-        # Parse the ranked results
-        result = json.loads(response.choices[0].message.content)
+        if chunked:
+            scores = _rank_in_chunks(job_requirements, chunks)
+        else:
+            scores = _score_candidates(job_requirements, candidate_profiles)
         
         # Map the results back to full candidate profiles
         candidates_by_id = {c['id']: c for c in candidate_profiles}
         ranked_candidates = []
         
-        for item in result:
-            candidate_id = item['id']
-            if candidate_id in candidates_by_id:
-                candidate = candidates_by_id[candidate_id].copy()
-                candidate['score'] = item['score']
-                ranked_candidates.append(candidate)
+        for candidate_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            candidate = candidates_by_id[candidate_id].copy()
+            candidate['score'] = score
+            ranked_candidates.append(candidate)
         
         return ranked_candidates
         
@@ -0,0 +1,243 @@
+"""
+Bulk ingestion service for the HR Recruitment System.
+Loads directories or zip archives of CVs with parallel extraction and batched inserts.
+"""
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from flask import current_app
+from sqlalchemy.dialects.postgresql import insert
+from ..models import Candidate, db
+from .cv_service import allowed_file, read_pdf_text, clean_text, store_resume_file
+from .cache_service import extract_candidate_data, extract_candidates_data
+from .gpt_service import pack_resumes
+from .embedding_service import compute_candidate_embedding
+from .taxonomy_service import normalize_skills, normalize_certifications, link_candidates
+from .match_service import bump_candidate_set_version
+from .storage_service import add_resume_references
+from .dedup_service import index_candidates
+
+def _extract_worker(path, max_chars=None):
+    """Process-pool entry point: return (path, text, error) for one PDF"""
+    try:
+        return path, read_pdf_text(path, max_chars), None
+    except Exception as e:
+        return path, None, str(e)
+
+def collect_resume_files(source):
+    """
+    List the PDFs to ingest from a directory or zip archive.
+
+    Zip members are extracted to a temporary directory that the caller
+    must remove.
+
+    Args:
+        source (str): Directory or .zip path
+
+    Returns:
+        (list, str): Sorted (relative name, absolute path) pairs and the temporary directory (or None)
+    """
+    temp_dir = None
+    root = source
+
+    if zipfile.is_zipfile(source):
+        temp_dir = tempfile.mkdtemp(prefix='hr-ingest-')
+        with zipfile.ZipFile(source) as archive:
+            members = [m for m in archive.infolist() if not m.is_dir() and allowed_file(m.filename)]
+            for member in members:
+                # ZipFile.extract sanitises absolute and parent-relative member names
+                archive.extract(member, temp_dir)
+        root = temp_dir
+
+    files = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if allowed_file(filename):
+                path = os.path.join(directory, filename)
+                files.append((os.path.relpath(path, root), path))
+
+    return sorted(files), temp_dir
+
+def _load_checkpoint(checkpoint_path, source):
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('source') != os.path.abspath(source):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to another source: {checkpoint.get('source')}")
+    return set(checkpoint.get('done', []))
+
+def _save_checkpoint(checkpoint_path, source, done):
+    temp_path = f'{checkpoint_path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.abspath(source), 'done': sorted(done)}, f)
+    os.replace(temp_path, checkpoint_path)
+
+def _candidate_row(data, resume_path, user_id):
+    """Build a candidates row from extracted data"""
+    data = dict(
+        data,
+        skills=normalize_skills(data.get('skills')),
+        certifications=normalize_certifications(data.get('certifications'))
+    )
+    age = data.get('age')
+    return {
+        'name': (data.get('name') or '')[:100],
+        'email': data.get('email') or None,
+        'phone': (data.get('phone') or '')[:20] or None,
+        'age': age if isinstance(age, int) else None,
+        'education': data.get('education'),
+        'skills': data.get('skills') or [],
+        'experience': data.get('experience'),
+        'experience_level': data.get('experience_level'),
+        'industry': data.get('industry'),
+        'certifications': data.get('certifications') or [],
+        'resume_path': resume_path,
+        'embedding': compute_candidate_embedding(data),
+        'created_by': user_id,
+    }
+
+def _analyze(app, cleaned_text):
+    """Thread-pool entry point: run (cached) GPT extraction in an app context"""
+    with app.app_context():
+        return extract_candidate_data(cleaned_text)[0]
+
+def _analyze_pack(app, pack, pack_size):
+    """Thread-pool entry point: run (cached) packed GPT extraction in an app context"""
+    with app.app_context():
+        return extract_candidates_data(pack, pack_size)
+
+def _insert_candidates(rows):
+    """
+    Insert candidates with one multi-row statement, skipping duplicate emails,
+    and link the inserted rows to the skill/certification taxonomy.
+
+    Returns:
+        int: Number of inserted rows
+    """
+    if not rows:
+        return 0
+    statement = insert(Candidate).values(rows).on_conflict_do_nothing(
+        index_elements=['email']
+    ).returning(Candidate.id, Candidate.email, Candidate.resume_path, Candidate.skills, Candidate.certifications)
+    inserted = db.session.execute(statement).all()
+    link_candidates([(row.id, row.skills, row.certifications) for row in inserted])
+
+    # Rows are matched back by email; rows without one are unique by resume path
+    profiles = {(row['email'], row['resume_path']): row for row in rows}
+    index_candidates([(row.id, profiles[(row.email, row.resume_path)]) for row in inserted])
+    add_resume_references([row.resume_path for row in inserted])
+    db.session.commit()
+    if inserted:
+        bump_candidate_set_version()
+    return len(inserted)
+
+def ingest_resumes(source, user_id=None, processes=None, gpt_workers=None,
+                   batch_size=100, checkpoint_path=None, pack_size=None, echo=print):
+    """
+    Ingest every PDF in a directory or zip archive as candidates.
+
+    Text extraction runs on a process pool and GPT analysis on a bounded
+    thread pool, with short CVs packed several to a GPT request (see
+    GPT_RESUME_PACK_SIZE). Each batch is written with one multi-row insert and then
+    recorded in a checkpoint file, so an interrupted run resumes where it
+    stopped. Files that fail are not checkpointed and are retried next run.
+
+    Args:
+        source (str): Directory or .zip path
+        user_id (int): ID recorded as created_by
+        processes (int): Extraction processes, defaults to INGEST_PROCESSES
+        gpt_workers (int): Concurrent GPT calls, defaults to INGEST_GPT_WORKERS
+        batch_size (int): Files per batch and per insert statement
+        checkpoint_path (str): Progress file, defaults to <source>.ingest.json
+        pack_size (int): Most CVs per GPT request, defaults to GPT_RESUME_PACK_SIZE (1 = no packing)
+        echo (callable): Progress output function
+
+    Returns:
+        dict: Counts of inserted, duplicate, failed and skipped files
+    """
+    config = current_app.config
+    processes = processes or config['INGEST_PROCESSES']
+    gpt_workers = gpt_workers or config['INGEST_GPT_WORKERS']
+    pack_size = pack_size or config['GPT_RESUME_PACK_SIZE']
+    checkpoint_path = checkpoint_path or f"{os.path.abspath(source).rstrip(os.sep)}.ingest.json"
+    app = current_app._get_current_object()
+
+    extract = partial(_extract_worker, max_chars=config['PDF_TEXT_MAX_CHARS'])
+    summary = {'inserted': 0, 'duplicates': 0, 'failed': 0, 'skipped': 0}
+    files, temp_dir = collect_resume_files(source)
+
+    try:
+        done = _load_checkpoint(checkpoint_path, source)
+        pending = [(name, path) for name, path in files if name not in done]
+        summary['skipped'] = len(files) - len(pending)
+        echo(f"{len(files)} PDFs found, {len(pending)} to process")
+
+        with ProcessPoolExecutor(max_workers=processes) as extract_pool, \
+                ThreadPoolExecutor(max_workers=gpt_workers) as gpt_pool:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                names = {path: name for name, path in batch}
+
+                # Parallel text extraction
+                texts = {}
+                for path, text, error in extract_pool.map(extract, names, chunksize=4):
+                    if text:
+                        texts[path] = clean_text(text)
+                    else:
+                        current_app.logger.warning(f"Could not extract {names[path]}: {error or 'no text'}")
+                        summary['failed'] += 1
+
+                # Bounded-concurrency GPT analysis, one request per pack
+                paths = list(texts)
+                if pack_size > 1:
+                    extracted = {}
+                    packs = pack_resumes(texts, pack_size)
+                    for pack_results in gpt_pool.map(lambda pack: _analyze_pack(app, pack, pack_size), packs):
+                        extracted.update(pack_results)
+                    results = [extracted.get(path) for path in paths]
+                else:
+                    results = gpt_pool.map(lambda path: _analyze(app, texts[path]), paths)
+
+                rows = []
+                seen_emails = set()
+                for path, data in zip(paths, results):
+                    if not data or not data.get('name'):
+                        summary['failed'] += 1
+                        continue
+
+                    email = data.get('email') or None
+                    if email and email in seen_emails:
+                        summary['duplicates'] += 1
+                        done.add(names[path])
+                        continue
+
+                    stored_path = store_resume_file(path)
+                    if not stored_path:
+                        summary['failed'] += 1
+                        continue
+
+                    if email:
+                        seen_emails.add(email)
+                    rows.append(_candidate_row(data, stored_path, user_id))
+                    done.add(names[path])
+
+                # Rows skipped as duplicate emails leave their stored file
+                # unreferenced; flask prune-resumes removes it
+                inserted = _insert_candidates(rows)
+                summary['duplicates'] += len(rows) - inserted
+                summary['inserted'] += inserted
+                _save_checkpoint(checkpoint_path, source, done)
+                echo(f"Processed {min(start + batch_size, len(pending))}/{len(pending)}: "
+                     f"{summary['inserted']} inserted, {summary['duplicates']} duplicates, "
+                     f"{summary['failed']} failed")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return summary
@@ -0,0 +1,234 @@
+"""
+Background job service for the HR Recruitment System.
+Runs resume processing and GPT enrichment on a local worker pool and tracks progress in the database.
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from ..models import Candidate, ResumeJob, db
+from .resume_service import process_resume_file, local_extraction_mode
+from .cv_service import extract_text_from_pdf, clean_text
+from .cache_service import extract_candidate_data
+from .embedding_service import compute_candidate_embedding
+from .taxonomy_service import normalize_skills, normalize_certifications, link_candidates
+from .match_service import bump_candidate_set_version
+from .dedup_service import index_candidates
+
+# Stage of a finished enrichment job; its result holds the GPT extraction
+ENRICHED_STAGE = 'enriched'
+
+# Fields GPT may fill in when the rule-based extraction left them empty
+ENRICHABLE_FIELDS = ('education', 'experience', 'experience_level', 'industry', 'age')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """Create the worker pool on first use so each process gets its own"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config['RESUME_JOB_WORKERS'],
+                thread_name_prefix='resume-job'
+            )
+        return _executor
+
+def _update_job(job_id, **fields):
+    """Persist job fields and commit so other workers can see the change"""
+    job = db.session.get(ResumeJob, job_id)
+    if job is None:
+        return
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+
+def _create_job(file_path, user_id):
+    """Insert a queued job row and commit it before a worker can pick it up"""
+    job = ResumeJob(
+        id=str(uuid.uuid4()),
+        status='queued',
+        stage='queued',
+        progress=0,
+        resume_path=file_path,
+        created_by=user_id
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def _run_job(app, job_id, file_path, user_id):
+    """Worker entry point: run the pipeline and record its outcome"""
+    with app.app_context():
+        try:
+            _update_job(job_id, status='running', stage='started', progress=5)
+
+            result, status_code = process_resume_file(
+                file_path,
+                on_progress=lambda stage, percent: _update_job(job_id, stage=stage, progress=percent)
+            )
+            queue_enrichment(result, file_path, user_id)
+
+            _update_job(
+                job_id,
+                status='completed' if status_code < 300 else 'failed',
+                stage='done',
+                progress=100,
+                result=result,
+                status_code=status_code,
+                error=result.get('error')
+            )
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Resume job {job_id} failed: {e}")
+            _update_job(job_id, status='failed', stage='done', progress=100, status_code=500, error=str(e))
+
+def submit_resume_job(file_path, user_id):
+    """
+    Queue a saved resume for background processing.
+
+    Jobs run on an in-process thread pool; queued jobs are lost if the
+    worker process restarts.
+
+    Args:
+        file_path (str): Path of the saved PDF
+        user_id (int): ID of the user who uploaded the resume
+
+    Returns:
+        ResumeJob: The queued job
+    """
+    job = _create_job(file_path, user_id)
+
+    app = current_app._get_current_object()
+    _get_executor().submit(_run_job, app, job.id, file_path, user_id)
+    return job
+
+def apply_enrichment(candidate, candidate_data):
+    """
+    Merge a GPT extraction into a candidate saved from a rule-based one.
+
+    Only empty fields are filled and skills and certifications are
+    unioned, so edits made before saving are kept. Commits on change.
+
+    Args:
+        candidate (Candidate): Saved candidate
+        candidate_data (dict): GPT extraction for the candidate's resume
+
+    Returns:
+        bool: True if the candidate changed
+    """
+    changed = False
+    for field in ENRICHABLE_FIELDS:
+        if not getattr(candidate, field) and candidate_data.get(field):
+            setattr(candidate, field, candidate_data[field])
+            changed = True
+
+    skills = normalize_skills(list(candidate.skills or []) + list(candidate_data.get('skills') or []))
+    certifications = normalize_certifications(
+        list(candidate.certifications or []) + list(candidate_data.get('certifications') or [])
+    )
+    if skills != list(candidate.skills or []) or certifications != list(candidate.certifications or []):
+        candidate.skills = skills
+        candidate.certifications = certifications
+        changed = True
+
+    if not changed:
+        return False
+
+    profile = candidate.to_dict()
+    candidate.embedding = compute_candidate_embedding(profile)
+    link_candidates([(candidate.id, candidate.skills, candidate.certifications)])
+    index_candidates([(candidate.id, profile)])
+    db.session.commit()
+    bump_candidate_set_version()
+    return True
+
+def apply_pending_enrichment(candidate):
+    """
+    Apply a finished enrichment job for the candidate's resume, if any.
+
+    Called after saving, for enrichments that finished before the save;
+    later ones find the saved candidate themselves.
+
+    Args:
+        candidate (Candidate): Saved candidate
+
+    Returns:
+        bool: True if the candidate changed
+    """
+    if not candidate.resume_path:
+        return False
+    job = ResumeJob.query.filter_by(resume_path=candidate.resume_path, stage=ENRICHED_STAGE) \
+        .order_by(ResumeJob.updated_at.desc()).first()
+    if job is None or not job.result:
+        return False
+    return apply_enrichment(candidate, job.result)
+
+def _run_enrichment(app, job_id, file_path):
+    """Worker entry point: run GPT on a rule-extracted resume and merge the result"""
+    with app.app_context():
+        try:
+            _update_job(job_id, status='running', stage='analyzing', progress=50)
+
+            resume_text = extract_text_from_pdf(file_path)
+            candidate_data = extract_candidate_data(clean_text(resume_text))[0] if resume_text else None
+            if not candidate_data:
+                _update_job(job_id, status='failed', stage='done', progress=100, status_code=500,
+                            error='GPT enrichment failed')
+                return
+
+            # Commit the result before looking for the candidate, so a save
+            # racing with this job sees one or the other
+            _update_job(job_id, status='completed', stage=ENRICHED_STAGE, progress=100,
+                        result=candidate_data, status_code=200)
+            # Identical uploads share a stored file, so several candidates may match
+            for candidate in Candidate.query.filter_by(resume_path=file_path).all():
+                apply_enrichment(candidate, candidate_data)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Enrichment job {job_id} failed: {e}")
+            _update_job(job_id, status='failed', stage='done', progress=100, status_code=500, error=str(e))
+
+def queue_enrichment(result, file_path, user_id):
+    """
+    Queue background GPT enrichment for a rule-based extraction.
+
+    Does nothing unless LOCAL_EXTRACTION_MODE is 'enrich' and the result
+    came from the rules; otherwise the job ID is added to result['extraction'].
+
+    Args:
+        result (dict): process_resume_file payload
+        file_path (str): Path of the saved PDF
+        user_id (int): ID of the user who uploaded the resume
+
+    Returns:
+        ResumeJob or None: The queued job
+    """
+    extraction = result.get('extraction') or {}
+    if extraction.get('method') != 'rules' or local_extraction_mode() != 'enrich':
+        return None
+
+    job = _create_job(file_path, user_id)
+
+    app = current_app._get_current_object()
+    _get_executor().submit(_run_enrichment, app, job.id, file_path)
+    extraction['enrichment_job_id'] = job.id
+    return job
+
+def get_job(job_id, user_id=None):
+    """
+    Get a resume job by ID.
+
+    Args:
+        job_id (str): Job ID
+        user_id (int): If given, only return the job when it belongs to this user
+
+    Returns:
+        ResumeJob or None: Job if found, None otherwise
+    """
+    query = ResumeJob.query.filter_by(id=job_id)
+    if user_id is not None:
+        query = query.filter_by(created_by=user_id)
+    return query.first()
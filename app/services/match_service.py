@@ -0,0 +1,151 @@
+"""
+Job matching service for the HR Recruitment System.
+Shortlists and ranks candidates for job requirements, caching rankings per candidate-set version.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import select, text
+from ..cooperative import release_db_connection
+from ..models import Candidate, candidate_set_version, db
+from .embedding_service import shortlist_candidates
+from .gpt_service import rank_candidates_for_job
+
+_WHITESPACE = re.compile(r'\s+')
+
+class RankingCache:
+    """
+    Thread-safe LRU cache of rankings with a time-to-live.
+
+    Entries hold the candidate-set version they were computed at and
+    a candidate ID -> score map.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['created_at'] > ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, version, scores, max_entries):
+        with self._lock:
+            self._entries[key] = {'version': version, 'scores': scores, 'created_at': time.monotonic()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+ranking_cache = RankingCache()
+
+def get_candidate_set_version():
+    """
+    Get the current candidate-set version.
+
+    Read from the primary even inside replica_reads().
+
+    Returns:
+        int: Version shared by every worker process
+    """
+    # last_value is 1 both before and after the first nextval(); only is_called changes.
+    # Always read the primary: a standby only sees the sequence move when the primary
+    # WAL-logs it (every 32 nextval() calls), so inside replica_reads() it would lag bumps.
+    return db.session.execute(text(
+        'SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM candidate_set_version'
+    ), bind_arguments={'bind': db.engine}).scalar()
+
+def bump_candidate_set_version():
+    """
+    Mark cached rankings as out of date.
+
+    Call after committing any change to the candidates, so a reader that
+    sees the new version also sees the committed rows.
+    """
+    try:
+        db.session.execute(select(candidate_set_version.next_value()))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bumping candidate set version: {str(e)}")
+
+def requirements_key(job_requirements):
+    """Cache key for requirements text, ignoring case and whitespace differences"""
+    normalized = _WHITESPACE.sub(' ', job_requirements).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def _rank_profiles(job_requirements, candidate_ids):
+    """GPT-rank candidates by ID; returns {candidate_id: score}"""
+    if not candidate_ids:
+        return {}
+    candidates = Candidate.query.filter(Candidate.id.in_(candidate_ids)).all()
+    candidates_by_id = {candidate.id: candidate for candidate in candidates}
+
+    # Keep similarity order so the strongest candidates share the first chunk
+    profiles = [candidates_by_id[i].to_dict() for i in candidate_ids if i in candidates_by_id]
+    release_db_connection()
+    ranked = rank_candidates_for_job(job_requirements, profiles)
+    return {candidate['id']: candidate['score'] for candidate in ranked}
+
+def match_candidates(job_requirements):
+    """
+    Rank the candidates best suited to job requirements.
+
+    Repeat queries for the same requirements at the same candidate-set
+    version are served from cache. If candidates were added since, only
+    the newcomers on the shortlist are scored (up to MATCH_CACHE_RESCORE_MAX)
+    and merged with the cached scores.
+
+    Args:
+        job_requirements (str): Job requirements description
+
+    Returns:
+        list: (Candidate, score) pairs, best match first
+    """
+    config = current_app.config
+    key = requirements_key(job_requirements)
+    version = get_candidate_set_version()
+    cached = ranking_cache.get(key, config['MATCH_CACHE_TTL'])
+
+    if cached and cached['version'] == version:
+        scores = cached['scores']
+    else:
+        # Shortlist the most similar candidates locally before calling GPT
+        shortlist = shortlist_candidates(job_requirements)
+        new_ids = [i for i in shortlist if not cached or i not in cached['scores']]
+
+        if cached and len(new_ids) <= config['MATCH_CACHE_RESCORE_MAX']:
+            scores = {i: cached['scores'][i] for i in shortlist if i in cached['scores']}
+            scores.update(_rank_profiles(job_requirements, new_ids))
+        else:
+            scores = _rank_profiles(job_requirements, shortlist)
+
+        if scores:
+            ranking_cache.set(key, version, scores, config['MATCH_CACHE_SIZE'])
+
+    if not scores:
+        return []
+
+    # Summary columns only; deleted candidates simply drop out
+    candidates = Candidate.query.options(Candidate.summary_columns()).filter(
+        Candidate.id.in_(list(scores))
+    ).all()
+    return sorted(
+        ((candidate, scores[candidate.id]) for candidate in candidates),
+        key=lambda pair: pair[1],
+        reverse=True
+    )
@@ -0,0 +1,232 @@
+"""
+OpenAI client service for the HR Recruitment System.
+Shares one pooled client per process with rate limiting, retries and latency metrics.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+import openai
+from flask import current_app
+from .prompt_service import record_usage
+from ..metrics import OPENAI_REQUEST_DURATION, OPENAI_RETRIES
+
+# Errors worth retrying; anything else (bad request, auth) fails at once
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Latency samples kept per call type for percentiles
+LATENCY_WINDOW = 1000
+
+_client = None
+_client_pid = None
+_limiters = {}
+_client_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Callers take what they need up front and sleep off any deficit, so
+    concurrent callers queue in arrival order instead of spinning.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """
+        Take amount tokens, blocking until the bucket can cover them.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def adjust(self, amount):
+        """Return (positive) or charge (negative) tokens once actual usage is known"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+def _create_client(config):
+    """Build the pooled client; the SDK's own retries are off, we retry here"""
+    timeout = httpx.Timeout(config['OPENAI_TIMEOUT'], connect=config['OPENAI_CONNECT_TIMEOUT'])
+    http_client = httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=config['OPENAI_MAX_CONNECTIONS'],
+            max_keepalive_connections=config['OPENAI_MAX_CONNECTIONS'],
+        ),
+    )
+    return openai.OpenAI(
+        api_key=config['OPENAI_API_KEY'],
+        base_url=config['OPENAI_BASE_URL'],
+        timeout=timeout,
+        max_retries=0,
+        http_client=http_client,
+    )
+
+def get_client():
+    """
+    Get this process's shared OpenAI client.
+
+    The client (and its keep-alive connection pool) is created on first use
+    and again after a fork, since pooled sockets cannot be shared across processes.
+
+    Returns:
+        openai.OpenAI: Shared client
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            config = current_app.config
+            _client = _create_client(config)
+            _client_pid = os.getpid()
+            _limiters.clear()
+            if config['OPENAI_REQUESTS_PER_MINUTE']:
+                _limiters['requests'] = TokenBucket(config['OPENAI_REQUESTS_PER_MINUTE'])
+            if config['OPENAI_TOKENS_PER_MINUTE']:
+                _limiters['tokens'] = TokenBucket(config['OPENAI_TOKENS_PER_MINUTE'])
+        return _client
+
+def _retry_delay(error, attempt, config):
+    """Seconds to wait before retry number attempt (0-based)"""
+    # Honour the server's Retry-After on 429s
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), config['OPENAI_RETRY_MAX_DELAY'])
+        except ValueError:
+            pass
+    # Exponential backoff with full jitter
+    ceiling = min(config['OPENAI_RETRY_MAX_DELAY'], config['OPENAI_RETRY_BASE_DELAY'] * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+def _record_call(kind, seconds, retries, throttled, failed):
+    with _metrics_lock:
+        metrics = _metrics.setdefault(kind, {
+            'calls': 0, 'errors': 0, 'retries': 0, 'throttled_seconds': 0.0,
+            'latency_total': 0.0, 'latency_max': 0.0, 'samples': deque(maxlen=LATENCY_WINDOW)
+        })
+        metrics['calls'] += 1
+        metrics['errors'] += int(failed)
+        metrics['retries'] += retries
+        metrics['throttled_seconds'] += throttled
+        metrics['latency_total'] += seconds
+        metrics['latency_max'] = max(metrics['latency_max'], seconds)
+        metrics['samples'].append(seconds)
+    OPENAI_REQUEST_DURATION.observe(seconds, kind=kind, outcome='error' if failed else 'ok')
+    if retries:
+        OPENAI_RETRIES.inc(retries, kind=kind)
+
+def chat_completion(kind, messages, estimated_tokens, **params):
+    """
+    Create a chat completion through the shared client.
+
+    Waits for request and token rate-limit capacity, retries transient
+    failures with jittered exponential backoff, and records latency and
+    token usage under kind.
+
+    Args:
+        kind (str): Call type for metrics, e.g. 'resume' or 'ranking'
+        messages (list): Chat messages
+        estimated_tokens (int): Local estimate of the prompt tokens
+        **params: Extra arguments for chat.completions.create
+
+    Returns:
+        ChatCompletion: API response
+
+    Raises:
+        openai.OpenAIError: If the call fails or retries are exhausted
+    """
+    config = current_app.config
+    client = get_client()
+    params.setdefault('model', config['GPT_MODEL'])
+
+    started = time.monotonic()
+    retries = 0
+    throttled = 0.0
+    try:
+        while True:
+            if 'requests' in _limiters:
+                throttled += _limiters['requests'].acquire()
+            if 'tokens' in _limiters:
+                throttled += _limiters['tokens'].acquire(estimated_tokens)
+            try:
+                response = client.chat.completions.create(messages=messages, **params)
+                break
+            except RETRYABLE_ERRORS as e:
+                if retries >= config['OPENAI_MAX_RETRIES']:
+                    raise
+                delay = _retry_delay(e, retries, config)
+                retries += 1
+                current_app.logger.warning(
+                    f"OpenAI {kind} call failed ({type(e).__name__}), retry {retries} in {delay:.2f}s"
+                )
+                time.sleep(delay)
+    except Exception:
+        _record_call(kind, time.monotonic() - started, retries, throttled, failed=True)
+        raise
+
+    _record_call(kind, time.monotonic() - started, retries, throttled, failed=False)
+
+    # Settle the token bucket against what the call really used
+    usage = getattr(response, 'usage', None)
+    if 'tokens' in _limiters and getattr(usage, 'total_tokens', None):
+        _limiters['tokens'].adjust(estimated_tokens - usage.total_tokens)
+
+    record_usage(kind, response, estimated_tokens)
+    return response
+
+def get_openai_metrics():
+    """
+    Get OpenAI call metrics recorded by this process.
+
+    Returns:
+        dict: Call type -> calls, errors, retries, throttled_seconds and latency (ms: avg, p50, p95, max)
+    """
+    with _metrics_lock:
+        result = {}
+        for kind, metrics in _metrics.items():
+            samples = sorted(metrics['samples'])
+            percentile = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+            result[kind] = {
+                'calls': metrics['calls'],
+                'errors': metrics['errors'],
+                'retries': metrics['retries'],
+                'throttled_seconds': round(metrics['throttled_seconds'], 3),
+                'latency_ms': {
+                    'avg': round(metrics['latency_total'] / metrics['calls'] * 1000, 1),
+                    'p50': percentile(0.5),
+                    'p95': percentile(0.95),
+                    'max': round(metrics['latency_max'] * 1000, 1),
+                },
+            }
+        return result
@@ -0,0 +1,190 @@
+"""
+Prompt budget service for the HR Recruitment System.
+Estimates prompt tokens locally, trims prompt fields to a budget and records actual usage.
+"""
+import math
+import threading
+
+from flask import current_app
+from ..metrics import GPT_TOKENS
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# Conservative characters-per-token ratio used when tiktoken is unavailable
+CHARS_PER_TOKEN = 3.5
+
+# Chat format overhead per message (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = ' [...]'
+
+_encoding = None
+_usage = {}
+_usage_lock = threading.Lock()
+
+class PromptBudgetError(ValueError):
+    """Raised when a prompt cannot be made to fit its token budget"""
+
+def _get_encoding():
+    """Load the tiktoken encoding once; False if tiktoken cannot be used"""
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding('o200k_base')
+            except Exception as e:
+                # The encoding file is downloaded on first use and may be unreachable
+                current_app.logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+    return _encoding
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text.
+
+    Exact with tiktoken installed, otherwise a deliberate overestimate.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_message_tokens(messages):
+    """Estimate the input tokens of a list of chat messages"""
+    return sum(estimate_tokens(m['content']) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut text to at most max_tokens, marking the cut.
+
+    Args:
+        text (str): Text to shorten
+        max_tokens (int): Token limit
+
+    Returns:
+        str: The text, unchanged if it already fits
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+
+    keep = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    if keep <= 0:
+        return ''
+
+    encoding = _get_encoding()
+    if encoding:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:keep])
+    else:
+        head = text[:int(keep * CHARS_PER_TOKEN)]
+        # Prefer to cut at a word boundary
+        if ' ' in head[len(head) // 2:]:
+            head = head[:head.rindex(' ')]
+    return head.rstrip() + TRUNCATION_MARKER
+
+def fit_fields(fields, max_tokens):
+    """
+    Trim prompt fields so together they fit a token budget.
+
+    Fixed fields are kept whole. The tokens left over are shared among the
+    trimmable fields: short ones stay whole and long ones are truncated to
+    an equal share. Fixed fields are only cut, least important first, if
+    they alone exceed the budget.
+
+    Args:
+        fields (list): (name, text, trimmable) tuples, most important first
+        max_tokens (int): Token budget for all fields together
+
+    Returns:
+        dict: Field name -> text that fits
+    """
+    texts = {name: text or '' for name, text, _ in fields}
+    sizes = {name: estimate_tokens(text) for name, text in texts.items()}
+    fixed = [name for name, _, trimmable in fields if not trimmable]
+    trimmable = sorted((name for name, _, is_trimmable in fields if is_trimmable), key=sizes.get)
+
+    # Share what the fixed fields leave, smallest trimmable field first
+    remaining = max_tokens - sum(sizes[name] for name in fixed)
+    for index, name in enumerate(trimmable):
+        share = max(remaining, 0) // (len(trimmable) - index)
+        if sizes[name] > share:
+            texts[name] = truncate_to_tokens(texts[name], share)
+            sizes[name] = estimate_tokens(texts[name])
+        remaining -= sizes[name]
+
+    for name in reversed(fixed):
+        overflow = sum(sizes.values()) - max_tokens
+        if overflow <= 0:
+            break
+        texts[name] = truncate_to_tokens(texts[name], max(sizes[name] - overflow, 0))
+        sizes[name] = estimate_tokens(texts[name])
+
+    return texts
+
+def check_budget(messages, max_tokens):
+    """
+    Verify that chat messages fit the input budget before sending them.
+
+    Args:
+        messages (list): Chat messages
+        max_tokens (int): Input token budget
+
+    Returns:
+        int: Estimated input tokens
+
+    Raises:
+        PromptBudgetError: If the messages exceed the budget
+    """
+    estimated = estimate_message_tokens(messages)
+    if estimated > max_tokens:
+        raise PromptBudgetError(f"Prompt needs ~{estimated} tokens, budget is {max_tokens}")
+    return estimated
+
+def record_usage(kind, response, estimated_tokens):
+    """
+    Record the tokens a GPT call actually used.
+
+    Args:
+        kind (str): Call type, e.g. 'resume' or 'ranking'
+        response: OpenAI chat completion response
+        estimated_tokens (int): Local estimate of the prompt tokens
+    """
+    usage = getattr(response, 'usage', None)
+    prompt_tokens = getattr(usage, 'prompt_tokens', None) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', None) or 0
+
+    with _usage_lock:
+        totals = _usage.setdefault(kind, {
+            'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'estimated_prompt_tokens': 0
+        })
+        totals['calls'] += 1
+        totals['prompt_tokens'] += prompt_tokens
+        totals['completion_tokens'] += completion_tokens
+        totals['estimated_prompt_tokens'] += estimated_tokens
+    GPT_TOKENS.inc(prompt_tokens, kind=kind, type='prompt')
+    GPT_TOKENS.inc(completion_tokens, kind=kind, type='completion')
+
+    current_app.logger.debug(
+        f"GPT {kind} call: {prompt_tokens} prompt tokens (estimated {estimated_tokens}), "
+        f"{completion_tokens} completion tokens"
+    )
+
+def get_token_usage():
+    """
+    Get token usage recorded by this process.
+
+    Returns:
+        dict: Call type -> calls, prompt_tokens, completion_tokens and estimated_prompt_tokens
+    """
+    with _usage_lock:
+        return {kind: dict(totals) for kind, totals in _usage.items()}
@@ -0,0 +1,106 @@
+"""
+Resume processing pipeline for the HR Recruitment System.
+Runs PDF extraction, cleaning and rule-based or GPT analysis for an uploaded CV.
+"""
+from flask import current_app
+from .cv_service import extract_text_from_pdf, extract_contact_info, clean_text
+from .cache_service import extract_candidate_data, get_cache_stats
+from .extraction_service import extract_with_rules
+from ..metrics import stage_timer
+
+LOCAL_EXTRACTION_MODES = ('off', 'skip', 'enrich')
+
+def local_extraction_mode():
+    """
+    Get the configured LOCAL_EXTRACTION_MODE.
+
+    Returns:
+        str: 'off', 'skip' or 'enrich'
+
+    Raises:
+        ValueError: If the setting is anything else, rather than guessing what a typo meant
+    """
+    mode = current_app.config['LOCAL_EXTRACTION_MODE']
+    if mode not in LOCAL_EXTRACTION_MODES:
+        raise ValueError(f"LOCAL_EXTRACTION_MODE must be one of {', '.join(LOCAL_EXTRACTION_MODES)}, not {mode!r}")
+    return mode
+
+def process_resume_file(file_path, on_progress=None):
+    """
+    Run the full extraction pipeline for a saved resume.
+
+    Args:
+        file_path (str): Path of the saved PDF
+        on_progress (callable): Optional callback(stage, percent) called as stages start
+
+    Returns:
+        (dict, int): Response payload and HTTP status code
+    """
+    def progress(stage, percent):
+        if on_progress:
+            on_progress(stage, percent)
+
+    try:
+        # Extract text from PDF
+        progress('extracting', 10)
+        page_timings = []
+        with stage_timer('extract'):
+            resume_text = extract_text_from_pdf(file_path, page_timings=page_timings)
+        if not resume_text:
+            return {'error': 'Failed to extract text from PDF'}, 500
+        current_app.logger.debug(
+            f"Extracted {len(resume_text)} chars from {len(page_timings)} pages "
+            f"({sum(1 for p in page_timings if p.skipped)} image-only) in "
+            f"{sum(p.seconds for p in page_timings):.3f}s"
+        )
+
+        # Clean the extracted text
+        progress('cleaning', 40)
+        with stage_timer('clean'):
+            cleaned_text = clean_text(resume_text)
+
+            # Extract basic contact info using regex as a fallback
+            contact_info = extract_contact_info(cleaned_text)
+
+        # Structured CVs are read locally; GPT is skipped or left to background enrichment
+        confidence = None
+        mode = local_extraction_mode()
+        if mode != 'off':
+            with stage_timer('rules'):
+                local_data, confidence, pending = extract_with_rules(resume_text)
+            # Without enrichment nothing would fill in certifications the rules were unsure of
+            unresolved = mode == 'skip' and 'certifications' in pending
+            if confidence >= current_app.config['LOCAL_EXTRACTION_MIN_CONFIDENCE'] and not unresolved:
+                # Same payload shape as the GPT path; the regex contact details fill any gaps
+                for field in ('email', 'phone'):
+                    local_data[field] = local_data[field] or contact_info.get(field)
+                local_data['resume_path'] = file_path
+                local_data['cache'] = dict(get_cache_stats(), hit=False)
+                local_data['extraction'] = {'method': 'rules', 'confidence': confidence, 'pending': pending}
+                return local_data, 200
+
+        # Process with GPT, reusing the cached result for identical CVs
+        progress('analyzing', 50)
+        with stage_timer('gpt'):
+            candidate_data, cache_hit = extract_candidate_data(cleaned_text)
+
+        if not candidate_data:
+            # If GPT fails, return basic info with error
+            return {
+                'error': 'Partial processing only. GPT analysis failed.',
+                'email': contact_info.get('email'),
+                'phone': contact_info.get('phone'),
+                'resume_path': file_path
+            }, 207  # 207 Multi-Status
+
+        # Add resume path and cache status to the data
+        candidate_data = dict(candidate_data)
+        candidate_data['resume_path'] = file_path
+        candidate_data['cache'] = dict(get_cache_stats(), hit=cache_hit)
+        candidate_data['extraction'] = {'method': 'gpt', 'confidence': confidence}
+
+        return candidate_data, 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error in process_resume: {str(e)}")
+        return {'error': f'An error occurred: {str(e)}'}, 500
@@ -2,85 +2,65 @@
 Search service for the HR Recruitment System.
 Provides functionality for searching and filtering candidates.
 """
+import base64
+import json
+import threading
+import time
+
 from flask import current_app
-from sqlalchemy import or_, and_, func, text
-from ..models import Candidate, db
+from sqlalchemy import Float, and_, cast, delete, func, literal, or_, select, text, true, tuple_, union_all
+from sqlalchemy.dialects.postgresql import REAL
+from ..models import (
+    Candidate, CandidateStat, CandidateStatDelta, CANDIDATE_STATS_COMPACT, CANDIDATE_STATS_DELTAS,
+    CANDIDATE_STATS_UPSERT, candidate_stat_counts, candidate_stats_source, db
+)
+from .taxonomy_service import skills_filter, certifications_filter
+from .match_service import bump_candidate_set_version
+from .storage_service import release_resume
+from ..replica import replica_reads
 
-def basic_search(query_text, limit=100):
+def text_search_rank(query_text):
     """
-    Perform a basic text search across candidate data.
+    Build the full-text match condition and relevance score for a query.
+    
+    Uses websearch_to_tsquery, so quoted phrases, OR and -exclusions work.
     
     Args:
         query_text (str): Text to search for
-        limit (int): Maximum number of results to return
         
     Returns:
-        list: List of Candidate objects matching the search
+        (ClauseElement, ColumnElement): Match condition served by the GIN index, and ts_rank_cd score
     """
-    if not query_text:
-        return []
-    
-    # Split query into terms
-    terms = query_text.strip().split()
-    search_filters = []
-    
-    # Build filter for each term
-    for term in terms:
-        term_filter = or_(
-            Candidate.name.ilike(f'%{term}%'),
-            Candidate.email.ilike(f'%{term}%'),
-            Candidate.phone.ilike(f'%{term}%'),
-            Candidate.industry.ilike(f'%{term}%'),
-            Candidate.experience.ilike(f'%{term}%'),
-            Candidate.education.ilike(f'%{term}%'),
-            Candidate.experience_level.ilike(f'%{term}%'),
-            func.array_to_string(Candidate.skills, ',').ilike(f'%{term}%'),
-            func.array_to_string(Candidate.certifications, ',').ilike(f'%{term}%')
-        )
-        search_filters.append(term_filter)
-    
-    # Combine filters with AND
-    candidates = Candidate.query.filter(
-        and_(*search_filters)
-    ).limit(limit).all()
-    
-    return candidates
+    tsquery = func.websearch_to_tsquery('english', query_text)
+    match = Candidate.search_vector.op('@@')(tsquery)
+    rank = func.ts_rank_cd(Candidate.search_vector, tsquery, type_=Float)
+    return match, rank
 
-def advanced_search(filters, limit=100):
+def build_search_query(filters):
     """
-    Perform an advanced search with multiple filters.
+    Build the filtered candidate query used by the search API and advanced_search.
     
     Args:
-        filters (dict): Dictionary of search filters
-        limit (int): Maximum number of results to return
+        filters (dict): Search filters (query, skills, skills_mode,
+            experience_level, industry, certifications, certifications_mode,
+            min_age, max_age)
         
     Returns:
-        list: List of Candidate objects matching the search
+        (Query, ColumnElement): Query ordered by relevance (or newest first
+            without a text query), and the rank expression (None without a text query)
     """
     query = Candidate.query
+    rank = None
     
-    # Apply text search if provided
-    if filters.get('query'):
-        terms = filters['query'].strip().split()
-        search_filters = []
-        for term in terms:
-            term_filter = or_(
-                Candidate.name.ilike(f'%{term}%'),
-                Candidate.email.ilike(f'%{term}%'),
-                Candidate.phone.ilike(f'%{term}%'),
-                Candidate.industry.ilike(f'%{term}%'),
-                Candidate.experience.ilike(f'%{term}%'),
-                Candidate.education.ilike(f'%{term}%')
-            )
-            search_filters.append(term_filter)
-        query = query.filter(and_(*search_filters))
+    # Apply ranked full-text search if provided
+    query_text = (filters.get('query') or '').strip()
+    if query_text:
+        match, rank = text_search_rank(query_text)
+        query = query.filter(match)
     
-    # Filter by skills
+    # Filter by canonical skills ('all' or 'any' of them)
     if filters.get('skills') and isinstance(filters['skills'], list):
-        for skill in filters['skills']:
-            query = query.filter(
-                func.array_to_string(Candidate.skills, ',').ilike(f'%{skill}%')
-            )
+        query = query.filter(skills_filter(filters['skills'], filters.get('skills_mode') or 'all'))
     
     # Filter by experience level
     if filters.get('experience_level'):
@@ -94,12 +74,11 @@ def advanced_search(filters, limit=100):
             Candidate.industry.ilike(f'%{filters["industry"]}%')
         )
     
-    # Filter by certifications
+    # Filter by canonical certifications ('all' or 'any' of them)
     if filters.get('certifications') and isinstance(filters['certifications'], list):
-        for cert in filters['certifications']:
-            query = query.filter(
-                func.array_to_string(Candidate.certifications, ',').ilike(f'%{cert}%')
-            )
+        query = query.filter(
+            certifications_filter(filters['certifications'], filters.get('certifications_mode') or 'all')
+        )
     
     # Filter by age range
     if filters.get('min_age'):
@@ -108,10 +87,259 @@ def advanced_search(filters, limit=100):
     if filters.get('max_age'):
         query = query.filter(Candidate.age <= filters['max_age'])
     
-    # Execute query with limit
-    candidates = query.limit(limit).all()
+    if rank is not None:
+        query = query.order_by(rank.desc(), Candidate.id.desc())
+    else:
+        query = query.order_by(Candidate.id.desc())
+    
+    return query, rank
+
+@replica_reads()
+def basic_search(query_text, limit=100):
+    """
+    Perform a ranked full-text search across candidate data.
+    
+    Args:
+        query_text (str): Text to search for
+        limit (int): Maximum number of results to return
+        
+    Returns:
+        list: List of Candidate objects matching the search, most relevant first
+    """
+    if not query_text or not query_text.strip():
+        return []
+    
+    query, _ = build_search_query({'query': query_text})
+    return query.limit(limit).all()
+
+@replica_reads()
+def advanced_search(filters, limit=100):
+    """
+    Perform an advanced search with multiple filters.
+    
+    Args:
+        filters (dict): Dictionary of search filters
+        limit (int): Maximum number of results to return
+        
+    Returns:
+        list: List of Candidate objects matching the search, most relevant first
+    """
+    query, _ = build_search_query(filters)
+    return query.limit(limit).all()
+
+def encode_cursor(values):
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or not values:
+        raise ValueError('Invalid cursor')
+    return values
+
+def estimate_count(query):
+    """
+    Estimate how many rows a query returns from the planner, without COUNT(*).
+    
+    Args:
+        query (Query): Query to estimate
+        
+    Returns:
+        int: Planner row estimate
+    """
+    compiled = query.statement.compile(
+        dialect=db.session.get_bind().dialect,
+        compile_kwargs={'render_postcompile': True}
+    )
+    plan = db.session.connection().exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+# Facet -> (candidate_stats dimension, number of top values reported, None for all)
+SEARCH_FACETS = {
+    'experience_level': ('experience_level', None),
+    'industry': ('industry', 10),
+    'certifications': ('certification', 10),
+    'skills': ('skill', 15),
+}
+
+def _top_facet_values(counts):
+    """
+    Keep the most common values of each facet and group them by facet.
+    
+    Args:
+        counts (Subquery): Rows of (facet, value, count)
+        
+    Returns:
+        dict: Facet name -> list of {'value', 'count'}, most common first
+    """
+    position = func.row_number().over(
+        partition_by=counts.c.facet, order_by=(counts.c.count.desc(), counts.c.value)
+    ).label('position')
+    ranked = select(counts, position).subquery('ranked')
+    
+    keep = [
+        and_(ranked.c.facet == facet, ranked.c.position <= limit) if limit else ranked.c.facet == facet
+        for facet, (_, limit) in SEARCH_FACETS.items()
+    ]
+    rows = db.session.execute(
+        select(ranked.c.facet, ranked.c.value, ranked.c.count)
+        .where(or_(*keep))
+        .order_by(ranked.c.facet, ranked.c.position)
+    )
     
-    return candidates
+    facets = {facet: [] for facet in SEARCH_FACETS}
+    for facet, value, count in rows:
+        facets[facet].append({'value': value, 'count': count})
+    return facets
+
+def search_facets(query):
+    """
+    Count the values of each SEARCH_FACETS column over a filtered candidate set.
+    
+    All facets come from one statement: the filtered set is a CTE that
+    Postgres materializes once, each facet is a GROUP BY over it (array
+    columns are unnested first) and a window keeps the top values per
+    facet. Without filters the counts are read from candidate_stats (plus
+    the deltas not yet compacted into it) instead.
+    
+    Args:
+        query (Query): Filtered candidate query, as from build_search_query
+        
+    Returns:
+        dict: Facet name -> list of {'value', 'count'}, most common first
+    """
+    branches = []
+    if query.whereclause is None:
+        _compact_stats_if_due()
+        stats = candidate_stat_counts()
+        # '' is stored in place of NULL
+        for facet, (dimension, _) in SEARCH_FACETS.items():
+            branches.append(
+                select(literal(facet).label('facet'), stats.c.value, stats.c.count)
+                .where(stats.c.dimension == dimension, stats.c.value != '', stats.c.count > 0)
+            )
+        return _top_facet_values(union_all(*branches).subquery('counts'))
+    
+    matched = query.with_entities(
+        Candidate.experience_level, Candidate.industry, Candidate.certifications, Candidate.skills
+    ).order_by(None).cte('matched')
+    
+    for facet in SEARCH_FACETS:
+        source, value = matched, matched.c[facet]
+        if facet in ('certifications', 'skills'):
+            unnested = func.unnest(value).table_valued('value').render_derived().lateral()
+            source, value = matched.join(unnested, true()), unnested.c.value
+        branches.append(
+            select(literal(facet).label('facet'), value.label('value'), func.count().label('count'))
+            .select_from(source)
+            .where(value.is_not(None), value != '')
+            .group_by(value)
+        )
+    return _top_facet_values(union_all(*branches).subquery('counts'))
+
+@replica_reads()
+def paginate_search(filters, cursor=None, page_size=None):
+    """
+    Fetch one page of search results using keyset pagination.
+    
+    Results are ordered by (rank, id) with a text query and by id otherwise,
+    and the cursor holds the last row's sort key, so every page costs the
+    same regardless of depth. The total is a planner estimate and, like the
+    facet counts, is returned on the first page only.
+    
+    Args:
+        filters (dict): Search filters, as for build_search_query
+        cursor (str): next_cursor from the previous page
+        page_size (int): Requested page size, capped at SEARCH_MAX_PAGE_SIZE
+        
+    Returns:
+        dict: candidates (list of Candidate with only the summary columns
+            loaded), next_cursor, total_estimate and facets (None after the first page)
+    """
+    config = current_app.config
+    page_size = min(max(int(page_size or config['SEARCH_PAGE_SIZE']), 1), config['SEARCH_MAX_PAGE_SIZE'])
+    
+    query, rank = build_search_query(filters)
+    query = query.options(Candidate.summary_columns())
+    
+    total_estimate = None
+    facets = None
+    if cursor is None:
+        total_estimate = estimate_count(query)
+        if config['SEARCH_FACETS_ENABLED']:
+            facets = search_facets(query)
+    else:
+        position = decode_cursor(cursor)
+        if rank is not None:
+            if len(position) != 2:
+                raise ValueError('Invalid cursor')
+            # ts_rank_cd returns real; compare as real so the boundary row matches exactly
+            query = query.filter(
+                tuple_(rank, Candidate.id) < tuple_(cast(float(position[0]), REAL), int(position[1]))
+            )
+        else:
+            query = query.filter(Candidate.id < int(position[-1]))
+    
+    if rank is not None:
+        rows = query.add_columns(rank).limit(page_size + 1).all()
+    else:
+        rows = [(candidate, None) for candidate in query.limit(page_size + 1).all()]
+    
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    next_cursor = None
+    if has_more:
+        last_candidate, last_rank = rows[-1]
+        position = [last_rank, last_candidate.id] if rank is not None else [last_candidate.id]
+        next_cursor = encode_cursor(position)
+    
+    # The planner estimate is meaningless once we know the exact answer
+    if cursor is None and not has_more:
+        total_estimate = len(rows)
+    
+    return {
+        'candidates': [candidate for candidate, _ in rows],
+        'next_cursor': next_cursor,
+        'total_estimate': total_estimate,
+        'facets': facets
+    }
+
+def iter_search_results(filters, full=False, batch_size=None):
+    """
+    Stream every candidate matching the filters, in search order.
+    
+    Rows come from a server-side cursor in batches, so memory stays flat
+    however many candidates match. The cursor's transaction stays open
+    until the iterator is exhausted or closed.
+    
+    Args:
+        filters (dict): Search filters, as for build_search_query
+        full (bool): Load every column instead of the summary projection
+        batch_size (int): Rows fetched per round trip, defaults to SEARCH_STREAM_BATCH_SIZE
+        
+    Yields:
+        Candidate: Matching candidates
+    """
+    query, _ = build_search_query(filters)
+    if not full:
+        query = query.options(Candidate.summary_columns())
+    
+    # Execute now so the cursor is opened on the replica; later batches come from the same server
+    with replica_reads():
+        rows = db.session.execute(
+            query.statement,
+            execution_options={'yield_per': batch_size or current_app.config['SEARCH_STREAM_BATCH_SIZE']}
+        ).scalars()
+    yield from rows
 
 def get_candidate_by_id(candidate_id):
     """
@@ -149,71 +377,70 @@ def get_all_candidates(limit=1000):
     """
     return Candidate.query.limit(limit).all()
 
+# Dimension -> number of top values reported (None for all)
+STATS_DIMENSIONS = {
+    'experience_level': None,
+    'industry': 5,
+    'skill': 10,
+    'certification': 5,
+}
+
+# Advisory lock held by whichever process is folding deltas into candidate_stats
+STATS_COMPACT_LOCK = 0x63616e64
+
+_compact_lock = threading.Lock()
+_compact_state = {'checked_at': None}
+
+@replica_reads()
 def get_candidates_stats():
     """
     Get statistics about candidates in the database.
     
+    One query reads the trigger-maintained candidate_stats table plus the
+    deltas not yet compacted into it. Reads compact the deltas once more
+    than STATS_COMPACT_THRESHOLD are pending, so the work stays bounded by
+    the number of distinct values rather than candidates or writes.
+    
     Returns:
-        dict: Dictionary with statistics
+        dict: Dictionary with statistics and the time they were last updated
     """
     try:
-        total_count = Candidate.query.count()
-        
-        # Get counts by experience level
-        experience_counts = db.session.query(
-            Candidate.experience_level, 
-            func.count(Candidate.id)
-        ).group_by(Candidate.experience_level).all()
-        
-        experience_stats = {level: count for level, count in experience_counts}
-        
-        # Get top industries
-        industry_counts = db.session.query(
-            Candidate.industry, 
-            func.count(Candidate.id)
-        ).group_by(Candidate.industry).order_by(
-            func.count(Candidate.id).desc()
-        ).limit(5).all()
-        
-        top_industries = {industry: count for industry, count in industry_counts}
-        
-        # Get top skills (this is more complex because skills is an array)
-        # Using raw SQL for this query
-        top_skills_query = text("""
-            SELECT skill, COUNT(*) as count
-            FROM (
-                SELECT unnest(skills) as skill
-                FROM candidates
-            ) as skill_list
-            GROUP BY skill
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        
-        top_skills_result = db.session.execute(top_skills_query)
-        top_skills = {row[0]: row[1] for row in top_skills_result}
-        
-        # Get top certifications
-        top_certs_query = text("""
-            SELECT cert, COUNT(*) as count
-            FROM (
-                SELECT unnest(certifications) as cert
-                FROM candidates
-            ) as cert_list
-            GROUP BY cert
-            ORDER BY count DESC
-            LIMIT 5
-        """)
-        
-        top_certs_result = db.session.execute(top_certs_query)
-        top_certifications = {row[0]: row[1] for row in top_certs_result}
+        _compact_stats_if_due()
+        stats = candidate_stat_counts()
+        ranked = select(
+            stats.c.dimension, stats.c.value, stats.c.count,
+            func.row_number().over(
+                partition_by=stats.c.dimension, order_by=(stats.c.count.desc(), stats.c.value)
+            ).label('position'),
+            func.max(stats.c.updated_at).over().label('updated_at')
+        ).subquery('ranked')
+        
+        wanted = [ranked.c.dimension == 'total']
+        for dimension, limit in STATS_DIMENSIONS.items():
+            condition = and_(ranked.c.dimension == dimension, ranked.c.count > 0)
+            wanted.append(and_(condition, ranked.c.position <= limit) if limit else condition)
+        rows = db.session.execute(
+            select(ranked.c.dimension, ranked.c.value, ranked.c.count, ranked.c.updated_at)
+            .where(or_(*wanted))
+            .order_by(ranked.c.dimension, ranked.c.position)
+        ).all()
+        
+        total, updated_at = 0, None
+        counts = {dimension: {} for dimension in STATS_DIMENSIONS}
+        for dimension, value, count, updated_at in rows:
+            if dimension == 'total':
+                total = count
+            else:
+                # '' is stored in place of NULL
+                counts[dimension][value or None] = count
         
         return {
-            'total_candidates': total_count,
-            'by_experience_level': experience_stats,
-            'top_industries': top_industries,
-            'top_skills': top_skills,
-            'top_certifications': top_certifications
+            'total_candidates': total or 0,
+            'by_experience_level': counts['experience_level'],
+            'top_industries': counts['industry'],
+            'top_skills': counts['skill'],
+            'top_certifications': counts['certification'],
+            'updated_at': updated_at.isoformat() if updated_at else None
         }
         
     except Exception as e:
@@ -223,9 +450,73 @@ def get_candidates_stats():
             'by_experience_level': {},
             'top_industries': {},
             'top_skills': {},
-            'top_certifications': {}
+            'top_certifications': {},
+            'updated_at': None
         }
 
+def compact_candidates_stats(min_pending=1):
+    """
+    Fold the deltas appended by the triggers into candidate_stats.
+    
+    Runs in its own transaction on the primary, so it never commits the
+    caller's session. Writers keep appending while it runs, and a run that
+    finds another compaction in progress returns at once.
+    
+    Args:
+        min_pending (int): Skip the run unless at least this many deltas are pending
+    
+    Returns:
+        int: Number of delta rows folded in
+    """
+    with db.engine.begin() as connection:
+        if not connection.execute(text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': STATS_COMPACT_LOCK}).scalar():
+            return 0
+        pending = connection.execute(
+            text('SELECT count(*) FROM (SELECT 1 FROM candidate_stat_deltas LIMIT :limit) pending'),
+            {'limit': min_pending}
+        ).scalar()
+        if pending < min_pending:
+            return 0
+        return connection.execute(text(CANDIDATE_STATS_COMPACT)).scalar()
+
+def _compact_stats_if_due():
+    """Compact pending deltas past STATS_COMPACT_THRESHOLD, checking at most every STATS_COMPACT_INTERVAL per process"""
+    config = current_app.config
+    now = time.monotonic()
+    with _compact_lock:
+        checked_at = _compact_state['checked_at']
+        if checked_at is not None and now - checked_at < config['STATS_COMPACT_INTERVAL']:
+            return
+        # Claim the check so concurrent readers go ahead without waiting on it
+        _compact_state['checked_at'] = now
+    
+    try:
+        compact_candidates_stats(config['STATS_COMPACT_THRESHOLD'])
+    except Exception as e:
+        current_app.logger.error(f"Error compacting candidate stats: {str(e)}")
+
+def rebuild_candidates_stats():
+    """
+    Recompute candidate_stats from the candidates table.
+    
+    Only needed if the table drifts (e.g. after TRUNCATE or manual edits);
+    the triggers keep it current otherwise. Writers are blocked while it runs.
+    
+    Returns:
+        int: Number of candidates counted
+    """
+    db.session.execute(text('LOCK TABLE candidates IN SHARE MODE'))
+    db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': STATS_COMPACT_LOCK})
+    db.session.execute(delete(CandidateStatDelta))
+    db.session.execute(delete(CandidateStat))
+    db.session.execute(text(CANDIDATE_STATS_UPSERT.format(
+        deltas=CANDIDATE_STATS_DELTAS.format(changed=candidate_stats_source('candidates', 1))
+    )))
+    db.session.commit()
+    
+    total = db.session.get(CandidateStat, ('total', ''))
+    return total.count if total else 0
+
 def delete_candidate(candidate_id):
     """
     Delete a candidate.
@@ -241,8 +532,11 @@ def delete_candidate(candidate_id):
         return False, f"Candidate with ID {candidate_id} not found"
     
     try:
+        resume_path = candidate.resume_path
         db.session.delete(candidate)
         db.session.commit()
+        bump_candidate_set_version()
+        release_resume(resume_path)
         return True, "Candidate deleted successfully"
     except Exception as e:
         db.session.rollback()
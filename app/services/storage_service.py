@@ -0,0 +1,193 @@
+"""
+Resume storage service for the HR Recruitment System.
+Stores uploaded PDFs once per content hash in sharded directories and reference-counts them.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from ..models import Candidate, ResumeFile, db
+
+# Two levels of 256 directories keep each one small at millions of files
+SHARD_LEVELS = 2
+CHUNK_SIZE = 64 * 1024
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+def resume_storage_path(digest):
+    """
+    Path a PDF with the given content hash is stored at.
+
+    Args:
+        digest (str): SHA-256 hex digest
+
+    Returns:
+        str: <UPLOAD_FOLDER>/ab/cd/abcd....pdf
+    """
+    shards = [digest[2 * level:2 * level + 2] for level in range(SHARD_LEVELS)]
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], *shards, f'{digest}.pdf')
+
+def resume_digest(path):
+    """Content hash encoded in a stored resume path, None for paths stored before content addressing"""
+    if not path:
+        return None
+    name, _ = os.path.splitext(os.path.basename(path))
+    return name if DIGEST_PATTERN.match(name) else None
+
+def store_resume_stream(stream):
+    """
+    Store a PDF from a binary stream, hashing it while it is written.
+
+    The content goes to a temporary file next to the shards and is then
+    renamed into place, or dropped if an identical file is already stored.
+
+    Args:
+        stream: Readable binary file object
+
+    Returns:
+        str: Path of the stored file
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, temp_path = tempfile.mkstemp(suffix='.part', dir=upload_folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        digest = digest.hexdigest()
+        path = resume_storage_path(digest)
+
+        # Upsert before placing the file: the row lock orders this upload
+        # against a concurrent release_resume deleting the same file
+        now = datetime.utcnow()
+        db.session.execute(
+            insert(ResumeFile).values(
+                sha256=digest, path=path, size_bytes=size, ref_count=0, created_at=now, last_uploaded_at=now
+            ).on_conflict_do_update(index_elements=['sha256'], set_={'last_uploaded_at': now, 'path': path})
+        )
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        db.session.commit()
+        return path
+    except Exception:
+        db.session.rollback()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def add_resume_references(paths):
+    """
+    Count new candidate references to stored resumes; the caller commits.
+
+    Args:
+        paths (list): resume_path of each new candidate (repeats count again)
+    """
+    counts = {}
+    for path in paths:
+        digest = resume_digest(path)
+        if digest:
+            counts[digest] = counts.get(digest, 0) + 1
+    if not counts:
+        return
+
+    table = ResumeFile.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.sha256 == bindparam('digest'))
+        .values(ref_count=table.c.ref_count + bindparam('count')),
+        [{'digest': digest, 'count': count} for digest, count in counts.items()]
+    )
+
+def _delete_unreferenced(digests):
+    """Delete rows and files for unreferenced resumes past the upload grace period"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['RESUME_ORPHAN_GRACE'])
+    paths = db.session.execute(
+        delete(ResumeFile)
+        .where(ResumeFile.sha256.in_(digests), ResumeFile.ref_count <= 0, ResumeFile.last_uploaded_at < cutoff)
+        .returning(ResumeFile.path)
+    ).scalars().all()
+
+    # Remove the files while the deleted rows are still locked, so an
+    # identical upload waits and then writes the file again
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    db.session.commit()
+    return len(paths)
+
+def release_resume(path):
+    """
+    Drop a deleted candidate's reference to its resume.
+
+    The file is removed once no candidate references it and no upload of
+    it is pending (see RESUME_ORPHAN_GRACE). Files stored before content
+    addressing belong to a single candidate and are removed at once.
+
+    Args:
+        path (str): resume_path of the deleted candidate
+
+    Returns:
+        bool: True if the file was removed
+    """
+    digest = resume_digest(path)
+    if digest is None:
+        if path and os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+    ref_count = db.session.execute(
+        update(ResumeFile)
+        .where(ResumeFile.sha256 == digest)
+        .values(ref_count=func.greatest(ResumeFile.ref_count - 1, 0))
+        .returning(ResumeFile.ref_count)
+    ).scalar()
+    db.session.commit()
+
+    if ref_count is None or ref_count > 0:
+        return False
+    return _delete_unreferenced([digest]) > 0
+
+def prune_resume_files():
+    """
+    Recount references from candidates and delete unreferenced resumes.
+
+    Repairs counts left wrong by crashes or manual edits, and removes
+    uploads that were never saved once RESUME_ORPHAN_GRACE has passed.
+
+    Returns:
+        (int, int): Rows whose count was corrected and files removed
+    """
+    references = (
+        select(func.count(Candidate.id))
+        .where(Candidate.resume_path == ResumeFile.path)
+        .scalar_subquery()
+    )
+    corrected = db.session.execute(
+        update(ResumeFile)
+        .where(ResumeFile.ref_count != references)
+        .values(ref_count=references)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+
+    orphans = db.session.execute(select(ResumeFile.sha256).where(ResumeFile.ref_count <= 0)).scalars().all()
+    return corrected, _delete_unreferenced(orphans) if orphans else 0
@@ -0,0 +1,218 @@
+"""
+Taxonomy service for the HR Recruitment System.
+Normalizes skills and certifications to canonical names and maintains the link tables.
+"""
+import re
+
+from sqlalchemy import exists, false, func, select
+from sqlalchemy.dialects.postgresql import insert
+from ..models import Candidate, Skill, Certification, candidate_skills, candidate_certifications, db
+
+# Lowercased alias -> canonical display name
+SKILL_SYNONYMS = {
+    'js': 'JavaScript',
+    'javascript': 'JavaScript',
+    'ecmascript': 'JavaScript',
+    'ts': 'TypeScript',
+    'typescript': 'TypeScript',
+    'py': 'Python',
+    'python3': 'Python',
+    'python 3': 'Python',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'node js': 'Node.js',
+    'reactjs': 'React',
+    'react.js': 'React',
+    'golang': 'Go',
+    'c sharp': 'C#',
+    'postgres': 'PostgreSQL',
+    'postgresql': 'PostgreSQL',
+    'mssql': 'SQL Server',
+    'ms sql': 'SQL Server',
+    'microsoft sql server': 'SQL Server',
+    'k8s': 'Kubernetes',
+    'aws': 'AWS',
+    'amazon web services': 'AWS',
+    'gcp': 'Google Cloud',
+    'google cloud platform': 'Google Cloud',
+    'ml': 'Machine Learning',
+    'machine learning': 'Machine Learning',
+    'ms excel': 'Excel',
+    'microsoft excel': 'Excel',
+    'advanced excel': 'Excel',
+    'powerbi': 'Power BI',
+    'power bi': 'Power BI',
+    'ifrs': 'IFRS',
+    'us gaap': 'GAAP',
+    'gaap': 'GAAP',
+    'sap': 'SAP',
+    'sql': 'SQL',
+}
+
+CERTIFICATION_SYNONYMS = {
+    'ca': 'CA',
+    'ca(sa)': 'CA',
+    'ca (sa)': 'CA',
+    'aca': 'CA',
+    'chartered accountant': 'CA',
+    'chartered accountant (sa)': 'CA',
+    'cima': 'CIMA',
+    'acma': 'CIMA',
+    'fcma': 'CIMA',
+    'cgma': 'CIMA',
+    'chartered management accountant': 'CIMA',
+    'cfa': 'CFA',
+    'cfa charterholder': 'CFA',
+    'chartered financial analyst': 'CFA',
+    'acca': 'ACCA',
+    'cpa': 'CPA',
+    'certified public accountant': 'CPA',
+    'frm': 'FRM',
+    'financial risk manager': 'FRM',
+    'pmp': 'PMP',
+    'project management professional': 'PMP',
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+def taxonomy_key(name):
+    """Lowercased, whitespace-collapsed lookup key for a skill or certification"""
+    return _WHITESPACE.sub(' ', name or '').strip().lower()
+
+def _normalize(names, synonyms):
+    canonical = []
+    seen = set()
+    for name in names or []:
+        key = taxonomy_key(name)
+        if not key:
+            continue
+        display = synonyms.get(key) or _WHITESPACE.sub(' ', name).strip()
+        if taxonomy_key(display) not in seen:
+            seen.add(taxonomy_key(display))
+            canonical.append(display[:100])
+    return canonical
+
+def normalize_skills(names):
+    """
+    Map skill names to canonical names, dropping blanks and duplicates.
+
+    Args:
+        names (list): Skill names, e.g. from GPT output
+
+    Returns:
+        list: Canonical skill names in original order
+    """
+    return _normalize(names, SKILL_SYNONYMS)
+
+def normalize_certifications(names):
+    """
+    Map certification names to canonical names, dropping blanks and duplicates.
+
+    Args:
+        names (list): Certification names, e.g. from GPT output
+
+    Returns:
+        list: Canonical certification names in original order
+    """
+    return _normalize(names, CERTIFICATION_SYNONYMS)
+
+def _get_or_create_ids(model, names):
+    """Return {key: id} for names, inserting missing taxonomy rows"""
+    by_key = {taxonomy_key(name): name for name in names}
+    if not by_key:
+        return {}
+
+    db.session.execute(
+        insert(model).values([{'name': name, 'key': key} for key, name in by_key.items()])
+        .on_conflict_do_nothing(index_elements=['key'])
+    )
+    rows = db.session.query(model.key, model.id).filter(model.key.in_(by_key)).all()
+    return dict(rows)
+
+def link_candidates(candidates):
+    """
+    Link candidates to canonical skills and certifications.
+
+    Uses one multi-row insert per link table, so it serves single saves and
+    bulk ingestion alike. The caller commits.
+
+    Args:
+        candidates (list): (candidate_id, skills, certifications) tuples with normalized names
+    """
+    skill_ids = _get_or_create_ids(Skill, [s for _, skills, _ in candidates for s in skills or []])
+    cert_ids = _get_or_create_ids(Certification, [c for _, _, certs in candidates for c in certs or []])
+
+    skill_links = {
+        (candidate_id, skill_ids[taxonomy_key(s)])
+        for candidate_id, skills, _ in candidates for s in skills or []
+    }
+    cert_links = {
+        (candidate_id, cert_ids[taxonomy_key(c)])
+        for candidate_id, _, certs in candidates for c in certs or []
+    }
+
+    if skill_links:
+        db.session.execute(
+            insert(candidate_skills).values([
+                {'candidate_id': candidate_id, 'skill_id': skill_id} for candidate_id, skill_id in skill_links
+            ]).on_conflict_do_nothing()
+        )
+    if cert_links:
+        db.session.execute(
+            insert(candidate_certifications).values([
+                {'candidate_id': candidate_id, 'certification_id': cert_id} for candidate_id, cert_id in cert_links
+            ]).on_conflict_do_nothing()
+        )
+
+def _resolve_ids(model, names, synonyms):
+    """Map requested names to taxonomy IDs; unknown names map to None"""
+    keys = [taxonomy_key(name) for name in _normalize(names, synonyms)]
+    rows = dict(db.session.query(model.key, model.id).filter(model.key.in_(keys)).all()) if keys else {}
+    return [rows.get(key) for key in keys]
+
+def _link_filter(link_table, column_name, ids, mode):
+    """Build an indexed link-table filter with AND ('all') or OR ('any') semantics"""
+    column = link_table.c[column_name]
+    known = [i for i in ids if i is not None]
+
+    if mode == 'any':
+        if not known:
+            return false()
+        return exists().where(link_table.c.candidate_id == Candidate.id, column.in_(known))
+
+    # Every requested item must exist and be linked
+    if not known or len(known) != len(ids):
+        return false()
+    matching = select(link_table.c.candidate_id).where(column.in_(known)).group_by(
+        link_table.c.candidate_id
+    ).having(func.count() == len(known))
+    return Candidate.id.in_(matching)
+
+def skills_filter(names, mode='all'):
+    """
+    Filter candidates by canonical skills.
+
+    Args:
+        names (list): Skill names (synonyms are resolved)
+        mode (str): 'all' to require every skill, 'any' for at least one
+
+    Returns:
+        ClauseElement: Filter condition for a Candidate query
+    """
+    return _link_filter(candidate_skills, 'skill_id', _resolve_ids(Skill, names, SKILL_SYNONYMS), mode)
+
+def certifications_filter(names, mode='all'):
+    """
+    Filter candidates by canonical certifications.
+
+    Args:
+        names (list): Certification names (synonyms are resolved)
+        mode (str): 'all' to require every certification, 'any' for at least one
+
+    Returns:
+        ClauseElement: Filter condition for a Candidate query
+    """
+    return _link_filter(
+        candidate_certifications, 'certification_id',
+        _resolve_ids(Certification, names, CERTIFICATION_SYNONYMS), mode
+    )
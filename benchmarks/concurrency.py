@@ -0,0 +1,237 @@
+"""
+Concurrency benchmark for the HR Recruitment System.
+Serves the app with gunicorn sync and gevent workers and compares GPT-bound endpoint throughput.
+
+Each mode gets the same worker count and the same stubbed OpenAI latency,
+so the difference is how many requests a worker can keep in flight:
+    python -m benchmarks.concurrency --database-url postgresql://.../hr_bench --workers 2 --concurrency 50
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db  # noqa: E402
+from app.config import Config  # noqa: E402
+from benchmarks.fake_openai import start_server  # noqa: E402
+from benchmarks.run_benchmarks import JOB_REQUIREMENTS, git_commit, make_app, summarize  # noqa: E402
+from benchmarks.synthetic import SCALES, load_candidates, write_pdfs  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USERNAME, PASSWORD = 'benchmark', 'benchmark'
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _prepare(args, openai_base_url):
+    """Fill the benchmark database and create the benchmark user"""
+    from app.models import Candidate, User
+    from app.services.embedding_service import compute_candidate_embedding
+
+    app = make_app(args.database_url, openai_base_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        load_candidates(SCALES[args.scale], seed=args.seed)
+        # Stored embeddings keep the match shortlist off the timed path
+        for candidate in Candidate.query.order_by(Candidate.id):
+            candidate.embedding = compute_candidate_embedding(candidate.to_dict())
+        user = User(username=USERNAME, email='benchmark@example.com', is_admin=True)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+def _start_gunicorn(mode, args, port, openai_base_url, upload_dir):
+    """Start gunicorn with the given worker class and wait until it answers"""
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url,
+        OPENAI_API_KEY='benchmark',
+        OPENAI_BASE_URL=openai_base_url,
+        OPENAI_REQUESTS_PER_MINUTE='0',
+        OPENAI_TOKENS_PER_MINUTE='0',
+        RESUME_CACHE_BACKEND='none',
+        LOCAL_EXTRACTION_MODE='off',
+        DEDUP_ENABLED='false',
+        UPLOAD_FOLDER=upload_dir,
+    )
+    command = [
+        sys.executable, '-m', 'gunicorn', 'run:app',
+        '-k', mode, '-w', str(args.workers), '-b', f'127.0.0.1:{port}',
+        '--timeout', '300', '--log-level', 'warning',
+    ]
+    if mode == 'gevent':
+        command += ['--worker-connections', str(args.worker_connections)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/login', timeout=10)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'gunicorn ({mode}) did not start')
+
+def _login(base_url):
+    """Log in once and return the session cookie header shared by all clients"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    data = urllib.parse.urlencode({'username': USERNAME, 'password': PASSWORD}).encode()
+    opener.open(f'{base_url}/login', data=data, timeout=30)
+    return '; '.join(f'{cookie.name}={cookie.value}' for cookie in jar)
+
+def _multipart(field, filename, content):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'
+    ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+def _requests(endpoint, count, pdf_paths):
+    """(path, body, content type) for each request; requirements vary so no ranking is cached"""
+    if endpoint == 'match-job':
+        return [
+            ('/api/match-job', json.dumps({'requirements': f'{JOB_REQUIREMENTS} Opening {i}.'}).encode(),
+             'application/json')
+            for i in range(count)
+        ]
+    contents = []
+    for path in pdf_paths:
+        with open(path, 'rb') as f:
+            contents.append(f.read())
+    return [
+        ('/process-resume', *_multipart('resume', f'cv{i}.pdf', contents[i % len(contents)]))
+        for i in range(count)
+    ]
+
+def _load(base_url, cookie, requests, concurrency):
+    """Send requests from concurrency client threads; returns throughput and latency stats"""
+    def send(request):
+        path, body, content_type = request
+        started = time.perf_counter()
+        try:
+            call = urllib.request.Request(
+                base_url + path, data=body, headers={'Content-Type': content_type, 'Cookie': cookie}
+            )
+            with urllib.request.urlopen(call, timeout=300) as response:
+                response.read()
+                ok = response.status < 400
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, requests))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for seconds, ok in outcomes if ok]
+    result = summarize(latencies) if latencies else {'runs': 0}
+    result['errors'] = sum(1 for _, ok in outcomes if not ok)
+    result['wall_seconds'] = round(elapsed, 3)
+    result['throughput_rps'] = round(len(latencies) / elapsed, 2)
+    return result
+
+def run(args):
+    server = start_server(latency=args.latency / 1000, jitter=args.jitter / 1000)
+    print(f'Preparing {SCALES[args.scale]} candidates...', file=sys.stderr)
+    _prepare(args, server.base_url)
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='hr-bench-') as work_dir:
+        upload_dir = os.path.join(work_dir, 'uploads')
+        os.makedirs(upload_dir)
+        pdf_paths = write_pdfs(os.path.join(work_dir, 'pdfs'), 20, seed=args.seed)
+
+        for mode in args.modes:
+            port = _free_port()
+            process = _start_gunicorn(mode, args, port, server.base_url, upload_dir)
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                cookie = _login(base_url)
+                for endpoint in args.endpoints:
+                    print(f'Loading {endpoint} with {mode} workers...', file=sys.stderr)
+                    # Warm up connections and worker imports
+                    _load(base_url, cookie, _requests(endpoint, args.workers * 2, pdf_paths), args.workers)
+                    requests = _requests(endpoint, args.requests, pdf_paths)
+                    results[f'{endpoint}:{mode}'] = _load(base_url, cookie, requests, args.concurrency)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    server.shutdown()
+    return {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat(),
+            'git_commit': git_commit(),
+            'scale': args.scale,
+            'workers': args.workers,
+            'worker_connections': args.worker_connections,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'openai_latency_ms': args.latency,
+            'openai_jitter_ms': args.jitter,
+        },
+        'benchmarks': results,
+    }
+
+def report(results):
+    """Print throughput per endpoint and mode"""
+    print(f"{'endpoint:mode':<28}{'req/s':>10}{'median ms':>12}{'p95 ms':>10}{'errors':>8}", file=sys.stderr)
+    for name, result in results['benchmarks'].items():
+        print(f"{name:<28}{result['throughput_rps']:>10.2f}{result.get('median_ms', 0):>12.1f}"
+              f"{result.get('p95_ms', 0):>10.1f}{result['errors']:>8}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync and gevent workers on GPT-bound endpoints')
+    parser.add_argument('--database-url', default=os.environ.get('BENCHMARK_DATABASE_URL'),
+                        help='Database to WIPE and fill (default: $BENCHMARK_DATABASE_URL)')
+    parser.add_argument('--scale', choices=sorted(SCALES, key=SCALES.get), default='1k', help='Candidate rows')
+    parser.add_argument('--modes', nargs='+', choices=['sync', 'gevent'], default=['sync', 'gevent'])
+    parser.add_argument('--endpoints', nargs='+', choices=['match-job', 'process-resume'],
+                        default=['match-job', 'process-resume'])
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--worker-connections', type=int, default=100, help='Concurrent requests per gevent worker')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=100, help='Timed requests per endpoint and mode')
+    parser.add_argument('--latency', type=float, default=500, help='Stub OpenAI response delay in ms')
+    parser.add_argument('--jitter', type=float, default=50, help='Stub OpenAI random +/- delay in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('--database-url or BENCHMARK_DATABASE_URL is required')
+    if args.database_url == Config.SQLALCHEMY_DATABASE_URI:
+        parser.error('refusing to wipe the application database; use a dedicated benchmark database')
+
+    results = run(args)
+    report(results)
+
+    output = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f'Results written to {args.output}', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+OpenAI-compatible stub server for the HR Recruitment System benchmarks.
+Answers chat completions with canned extraction and ranking JSON after a configurable delay.
+
+Run standalone with:
+    python -m benchmarks.fake_openai --port 8900 --latency 200
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANDIDATE_ID = re.compile(r'Candidate ID: (\d+)')
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+RESUME_HEADER = re.compile(r'^=== RESUME (\S+) ===$', re.MULTILINE)
+
+def _resume(text):
+    """Canned extraction for one resume text"""
+    email = EMAIL.search(text)
+    return {
+        'name': ' '.join(text.split()[:2]) or 'Benchmark Candidate',
+        'email': email.group(0) if email else None,
+        'phone': None,
+        'skills': ['Python', 'SQL', 'Excel'],
+        'experience': text.strip()[:200],
+        'experience_level': 'Mid',
+        'education': 'BCom Accounting',
+        'certifications': ['CA'],
+        'industry': 'Finance',
+        'age': None,
+    }
+
+def _completion(body):
+    """Build a response for a chat completion request body"""
+    system = body['messages'][0]['content']
+    prompt = body['messages'][-1]['content']
+
+    if 'candidate matching' in system:
+        ids = [int(i) for i in CANDIDATE_ID.findall(prompt)]
+        content = {'rankings': [{'id': i, 'score': random.randint(0, 100)} for i in ids]}
+    elif 'several resumes' in system:
+        # Packed request: split on the header lines and answer each resume
+        parts = RESUME_HEADER.split(prompt)[1:]
+        content = {'results': [
+            dict(_resume(text), id=resume_id) for resume_id, text in zip(parts[::2], parts[1::2])
+        ]}
+    else:
+        content = _resume(prompt)
+
+    prompt_tokens = sum(len(m['content']) for m in body['messages']) // 4
+    completion = json.dumps(content)
+    return {
+        'id': 'chatcmpl-benchmark',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'stub'),
+        'choices': [{
+            'index': 0,
+            'finish_reason': 'stop',
+            'message': {'role': 'assistant', 'content': completion},
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(completion) // 4,
+            'total_tokens': prompt_tokens + len(completion) // 4,
+        },
+    }
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded stub server; latency and jitter are in seconds"""
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self):
+        """Serve on a daemon thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        server = self.server
+        with server._lock:
+            server.requests += 1
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        data = json.dumps(_completion(body)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def start_server(port=0, latency=0.0, jitter=0.0):
+    """
+    Start a stub server on localhost.
+
+    Args:
+        port (int): Port to listen on, 0 for any free port
+        latency (float): Seconds to wait before answering
+        jitter (float): Random +/- seconds added to the latency
+
+    Returns:
+        FakeOpenAIServer: Running server (see base_url)
+    """
+    return FakeOpenAIServer(('127.0.0.1', port), latency, jitter).start()
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenAI-compatible stub for benchmarks')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=200, help='Response delay in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='Random +/- delay in ms')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(('127.0.0.1', args.port), args.latency / 1000, args.jitter / 1000)
+    print(f'Fake OpenAI API on {server.base_url} (OPENAI_BASE_URL)')
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Benchmark runner for the HR Recruitment System.
+Times the upload, search, stats and ranking paths against synthetic data and writes JSON results.
+
+The benchmark database is wiped and refilled, so never point it at real data:
+    python -m benchmarks.run_benchmarks --database-url postgresql://.../hr_bench --scale 10k
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from benchmarks.fake_openai import start_server  # noqa: E402
+from benchmarks.synthetic import SCALES, load_candidates, write_pdfs  # noqa: E402
+
+SEARCH_QUERIES = ['python', 'chartered accountant audit', '"management accounts"', 'sap -java']
+
+ADVANCED_FILTERS = [
+    {'skills': ['Python', 'SQL'], 'experience_level': 'Senior'},
+    {'certifications': ['CA', 'CFA'], 'certifications_mode': 'any', 'industry': 'Finance'},
+    {'query': 'audit', 'skills': ['Excel'], 'min_age': 30, 'max_age': 45},
+]
+
+JOB_REQUIREMENTS = (
+    'Senior financial analyst for a banking group. CA or CFA required, strong Excel and SQL, '
+    'experience with IFRS reporting, budgeting and forecasting, Power BI dashboards a plus.'
+)
+
+def summarize(samples):
+    """Latency statistics in milliseconds for a list of durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+def measure(calls, repeat, warmup=1):
+    """
+    Time zero-argument callables.
+
+    Args:
+        calls (list): Callables timed once per round
+        repeat (int): Timed rounds
+        warmup (int): Untimed rounds first
+
+    Returns:
+        dict: summarize() of every timed call
+    """
+    for _ in range(warmup):
+        for call in calls:
+            call()
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def make_app(database_url, openai_base_url):
+    """App configured for the benchmark database and the stub API"""
+    config_class = type('BenchmarkConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'OPENAI_API_KEY': 'benchmark',
+        'OPENAI_BASE_URL': openai_base_url,
+        'OPENAI_REQUESTS_PER_MINUTE': 0,
+        'OPENAI_TOKENS_PER_MINUTE': 0,
+        'RESUME_CACHE_BACKEND': 'none',
+    })
+    return create_app(config_class)
+
+def run(args):
+    from app.models import Candidate
+    from app.services.cv_service import extract_text_from_pdf, clean_text
+    from app.services.search_service import basic_search, advanced_search, get_candidates_stats
+    from app.services.gpt_service import rank_candidates_for_job
+
+    server = start_server(latency=args.latency / 1000, jitter=args.jitter / 1000)
+    app = make_app(args.database_url, server.base_url)
+    count = SCALES[args.scale]
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='hr-bench-') as pdf_dir, app.app_context():
+        print(f'Preparing {count} candidates and {args.pdfs} PDFs...', file=sys.stderr)
+        db.drop_all()
+        db.create_all()
+        load_candidates(count, seed=args.seed)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        paths = write_pdfs(pdf_dir, args.pdfs, pages=args.pages, seed=args.seed)
+
+        print('Timing PDF extraction and cleaning...', file=sys.stderr)
+        results['extract_text_from_pdf'] = measure(
+            [lambda path=path: extract_text_from_pdf(path) for path in paths], args.repeat
+        )
+        texts = [extract_text_from_pdf(path) for path in paths]
+        results['clean_text'] = measure([lambda text=text: clean_text(text) for text in texts], args.repeat)
+
+        print('Timing search and stats...', file=sys.stderr)
+        results['basic_search'] = measure(
+            [lambda query=query: basic_search(query) for query in SEARCH_QUERIES], args.repeat
+        )
+        results['advanced_search'] = measure(
+            [lambda filters=filters: advanced_search(filters) for filters in ADVANCED_FILTERS], args.repeat
+        )
+        results['get_candidates_stats'] = measure([get_candidates_stats], args.repeat)
+
+        print('Timing GPT ranking against the stub...', file=sys.stderr)
+        profiles = [
+            candidate.to_dict()
+            for candidate in Candidate.query.order_by(Candidate.id).limit(app.config['MATCH_SHORTLIST_SIZE'])
+        ]
+        requests_before = server.requests
+        results['rank_candidates_for_job'] = measure(
+            [lambda: rank_candidates_for_job(JOB_REQUIREMENTS, profiles)], args.ranking_repeat
+        )
+        results['rank_candidates_for_job']['api_calls_per_run'] = round(
+            (server.requests - requests_before) / (args.ranking_repeat + 1), 2
+        )
+
+    server.shutdown()
+    return {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'candidates': count,
+            'pdfs': args.pdfs,
+            'pdf_pages': args.pages,
+            'openai_latency_ms': args.latency,
+            'openai_jitter_ms': args.jitter,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'benchmarks': results,
+    }
+
+def compare(current, baseline_path):
+    """Print the median change of each benchmark against an earlier results file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline_results = json.load(f)
+    baseline = baseline_results['benchmarks']
+    for setting in ('scale', 'pdfs', 'pdf_pages', 'openai_latency_ms'):
+        if baseline_results['meta'].get(setting) != current['meta'][setting]:
+            print(f"Note: {setting} differs from the baseline run", file=sys.stderr)
+    print(f"{'benchmark':<26}{'baseline ms':>14}{'current ms':>14}{'change':>10}", file=sys.stderr)
+    for name, result in current['benchmarks'].items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['median_ms'], result['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        print(f'{name:<26}{before:>14.3f}{after:>14.3f}{change:>+9.1f}%', file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HR Recruitment System hot paths')
+    parser.add_argument('--database-url', default=os.environ.get('BENCHMARK_DATABASE_URL'),
+                        help='Database to WIPE and fill (default: $BENCHMARK_DATABASE_URL)')
+    parser.add_argument('--scale', choices=sorted(SCALES, key=SCALES.get), default='1k', help='Candidate rows')
+    parser.add_argument('--pdfs', type=int, default=20, help='Synthetic CV PDFs to extract')
+    parser.add_argument('--pages', type=int, default=2, help='Pages per synthetic CV')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per benchmark')
+    parser.add_argument('--ranking-repeat', type=int, default=3, help='Timed GPT ranking runs')
+    parser.add_argument('--latency', type=float, default=200, help='Stub OpenAI response delay in ms')
+    parser.add_argument('--jitter', type=float, default=50, help='Stub OpenAI random +/- delay in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    parser.add_argument('--compare', help='Earlier results file to compare medians against')
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('--database-url or BENCHMARK_DATABASE_URL is required')
+    if args.database_url == Config.SQLALCHEMY_DATABASE_URI:
+        parser.error('refusing to wipe the application database; use a dedicated benchmark database')
+
+    results = run(args)
+
+    output = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f'Results written to {args.output}', file=sys.stderr)
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
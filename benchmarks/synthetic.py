@@ -0,0 +1,147 @@
+"""
+Synthetic data for the HR Recruitment System benchmarks.
+Generates CV PDFs and candidate rows from a seeded random source.
+"""
+import os
+import random
+
+from sqlalchemy.dialects.postgresql import insert
+
+FIRST_NAMES = ['Thabo', 'Anna', 'Sipho', 'Maria', 'John', 'Lerato', 'Pieter', 'Aisha', 'David', 'Naledi']
+LAST_NAMES = ['Nkosi', 'Smith', 'van der Merwe', 'Dlamini', 'Naidoo', 'Botha', 'Mokoena', 'Patel', 'Jacobs']
+SKILLS = [
+    'Python', 'SQL', 'Excel', 'JavaScript', 'Java', 'Power BI', 'SAP', 'IFRS', 'Financial Modelling',
+    'Auditing', 'Tax', 'Budgeting', 'AWS', 'Docker', 'React', 'Machine Learning', 'Project Management',
+    'Risk Management', 'Treasury', 'PostgreSQL'
+]
+CERTIFICATIONS = ['CA', 'CIMA', 'CFA', 'ACCA', 'CPA', 'FRM', 'PMP']
+INDUSTRIES = ['Finance', 'Banking', 'Insurance', 'Technology', 'Retail', 'Mining', 'Consulting', 'Healthcare']
+LEVELS = ['Junior', 'Mid', 'Senior']
+DUTIES = [
+    'prepared monthly management accounts', 'led the year-end audit', 'built reporting dashboards',
+    'automated reconciliations in Python', 'managed a team of analysts', 'implemented SAP modules',
+    'owned the budgeting and forecasting cycle', 'migrated workloads to AWS', 'designed SQL data models',
+    'advised clients on IFRS adoption', 'reduced close time by two days', 'ran treasury operations'
+]
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000}
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def make_pdf(pages):
+    """
+    Build a minimal PDF with one Helvetica text block per page.
+
+    Args:
+        pages (list): Page texts, lines separated by newlines
+
+    Returns:
+        bytes: PDF file content
+    """
+    objects = [b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    pages_id = 2 + 2 * len(pages)
+    kids = []
+
+    for page in pages:
+        lines = b' '.join(b'(' + _escape(line).encode('latin-1', 'replace') + b") '" for line in page.split('\n'))
+        content = b'BT /F1 10 Tf 50 760 Td 12 TL ' + lines + b' ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        objects.append(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R '
+            b'/Resources << /Font << /F1 1 0 R >> >> >>' % (pages_id, len(objects))
+        )
+        kids.append(len(objects))
+
+    objects.append(b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % k for k in kids) + b'] /Count %d >>' % len(kids))
+    objects.append(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    output = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, len(objects), xref)
+    return output
+
+def fake_candidate(rng, index):
+    """Build one synthetic candidate as a dict of column values"""
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    level = rng.choice(LEVELS)
+    return {
+        'name': name,
+        'email': f'candidate{index}@bench.invalid',
+        'phone': f'+27 82 {index % 1000:03d} {index % 10000:04d}',
+        'age': rng.randint(21, 60),
+        'education': rng.choice(['BCom Accounting', 'BSc Computer Science', 'BCom Honours', 'MBA']),
+        'skills': rng.sample(SKILLS, rng.randint(3, 8)),
+        'experience': '. '.join(rng.choice(DUTIES) for _ in range(rng.randint(3, 12))).capitalize() + '.',
+        'experience_level': level,
+        'industry': rng.choice(INDUSTRIES),
+        'certifications': rng.sample(CERTIFICATIONS, rng.randint(0, 2)),
+    }
+
+def cv_pages(candidate, pages):
+    """Render a candidate as CV page texts"""
+    header = f"{candidate['name']}\n{candidate['email']}  {candidate['phone']}\n"
+    body = [
+        f"Skills: {', '.join(candidate['skills'])}",
+        f"Certifications: {', '.join(candidate['certifications']) or 'None'}",
+        f"Industry: {candidate['industry']}  Level: {candidate['experience_level']}",
+        f"Education: {candidate['education']}",
+    ]
+    texts = []
+    for page in range(pages):
+        duties = [candidate['experience']] * 30
+        texts.append((header if page == 0 else '') + '\n'.join(body + duties))
+    return texts
+
+def write_pdfs(directory, count, pages=2, seed=0):
+    """
+    Write synthetic CV PDFs.
+
+    Args:
+        directory (str): Output directory (created if missing)
+        count (int): Number of PDFs
+        pages (int): Pages per PDF
+        seed (int): Random seed
+
+    Returns:
+        list: Paths of the written PDFs
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f'cv_{index:05d}.pdf')
+        with open(path, 'wb') as f:
+            f.write(make_pdf(cv_pages(fake_candidate(rng, index), pages)))
+        paths.append(path)
+    return paths
+
+def load_candidates(count, batch_size=1000, seed=0):
+    """
+    Insert synthetic candidates with multi-row inserts and link their taxonomy.
+
+    Must run in an app context against an empty benchmark database.
+
+    Args:
+        count (int): Number of candidates
+        batch_size (int): Rows per insert statement
+        seed (int): Random seed
+    """
+    from app.models import Candidate, db
+    from app.services.taxonomy_service import link_candidates
+
+    rng = random.Random(seed)
+    for start in range(0, count, batch_size):
+        rows = [fake_candidate(rng, index) for index in range(start, min(start + batch_size, count))]
+        inserted = db.session.execute(
+            insert(Candidate).values(rows).returning(Candidate.id, Candidate.skills, Candidate.certifications)
+        ).all()
+        link_candidates([(row.id, row.skills, row.certifications) for row in inserted])
+        db.session.commit()
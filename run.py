@@ -1,4 +1,5 @@
 import os
+import click
 from app import create_app, db
 from app.models import User, Candidate
 from werkzeug.security import generate_password_hash
@@ -60,5 +61,133 @@ def create_user():
         
         print(f"User {username} created successfully.")
 
+# Command to (re)compute candidate embeddings used by job matching
+@app.cli.command("reindex-embeddings")
+def reindex_embeddings():
+    """Recompute the job-match embedding for every candidate"""
+    from app.services.embedding_service import compute_candidate_embedding
+    from app.services.match_service import bump_candidate_set_version
+
+    with app.app_context():
+        updated = 0
+        for candidate in Candidate.query.order_by(Candidate.id).yield_per(500):
+            candidate.embedding = compute_candidate_embedding(candidate.to_dict())
+            updated += 1
+            if updated % 500 == 0:
+                db.session.flush()
+
+        db.session.commit()
+        bump_candidate_set_version()
+        print(f'Reindexed {updated} candidates.')
+
+# Command to normalize existing skills/certifications into the taxonomy tables
+@app.cli.command("backfill-taxonomy")
+def backfill_taxonomy():
+    """Normalize candidate skills and certifications and rebuild taxonomy links"""
+    from app.services.taxonomy_service import normalize_skills, normalize_certifications, link_candidates
+    from app.services.match_service import bump_candidate_set_version
+
+    with app.app_context():
+        processed = 0
+        last_id = 0
+        while True:
+            batch = Candidate.query.filter(Candidate.id > last_id).order_by(Candidate.id).limit(500).all()
+            if not batch:
+                break
+
+            for candidate in batch:
+                candidate.skills = normalize_skills(candidate.skills)
+                candidate.certifications = normalize_certifications(candidate.certifications)
+            link_candidates([(c.id, c.skills, c.certifications) for c in batch])
+            db.session.commit()
+
+            processed += len(batch)
+            last_id = batch[-1].id
+
+        bump_candidate_set_version()
+        print(f'Linked {processed} candidates to the skill/certification taxonomy.')
+
+# Command to recompute the dashboard statistics table
+@app.cli.command("rebuild-stats")
+def rebuild_stats():
+    """Recompute candidate statistics from the candidates table"""
+    from app.services.search_service import rebuild_candidates_stats
+
+    with app.app_context():
+        total = rebuild_candidates_stats()
+        print(f'Rebuilt statistics for {total} candidates.')
+
+# Command to fold pending statistics deltas into the statistics table
+@app.cli.command("compact-stats")
+def compact_stats():
+    """Fold the deltas appended by candidate writes into candidate_stats"""
+    from app.services.search_service import compact_candidates_stats
+
+    with app.app_context():
+        folded = compact_candidates_stats()
+        print(f'Compacted {folded} statistics deltas.')
+
+# Command to repair resume reference counts and remove unreferenced files
+@app.cli.command("prune-resumes")
+def prune_resumes():
+    """Recount resume references and delete files no candidate uses"""
+    from app.services.storage_service import prune_resume_files
+
+    with app.app_context():
+        corrected, removed = prune_resume_files()
+        print(f'Corrected {corrected} reference counts, removed {removed} unreferenced resumes.')
+
+# Command to report clusters of near-duplicate candidates
+@app.cli.command("find-duplicates")
+@click.option("--reindex", is_flag=True, help="Recompute every signature, not just missing ones.")
+def find_duplicates(reindex):
+    """Index candidate signatures and list likely duplicate clusters"""
+    from app.services.dedup_service import index_missing_candidates, find_duplicate_clusters
+
+    with app.app_context():
+        indexed = index_missing_candidates(reindex=reindex)
+        print(f'Indexed {indexed} candidates.')
+
+        clusters = find_duplicate_clusters()
+        for number, cluster in enumerate(clusters, 1):
+            print(f'Cluster {number}:')
+            for candidate in cluster:
+                print(f"  #{candidate['id']} {candidate['name']} <{candidate['email'] or '-'}> "
+                      f"{candidate['phone'] or '-'} (similarity {candidate['similarity']:.2f})")
+        print(f'Found {len(clusters)} duplicate clusters '
+              f'covering {sum(len(cluster) for cluster in clusters)} candidates.')
+
+# Command to bulk-load a directory or zip of CVs
+@app.cli.command("ingest")
+@click.argument("source", type=click.Path(exists=True))
+@click.option("--user", "username", default="admin", help="Username recorded as creator of the candidates.")
+@click.option("--processes", type=int, default=None, help="PDF extraction processes.")
+@click.option("--gpt-workers", type=int, default=None, help="Concurrent GPT calls.")
+@click.option("--batch-size", type=int, default=100, help="Files per batch insert.")
+@click.option("--checkpoint", default=None, help="Progress file (default: <source>.ingest.json).")
+@click.option("--pack-size", type=int, default=None, help="Most CVs per GPT request (1 disables packing).")
+def ingest(source, username, processes, gpt_workers, batch_size, checkpoint, pack_size):
+    """Ingest every PDF in a directory or zip archive"""
+    from app.services.ingest_service import ingest_resumes
+
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            print(f"User {username} does not exist.")
+            return
+
+        summary = ingest_resumes(
+            source,
+            user_id=user.id,
+            processes=processes,
+            gpt_workers=gpt_workers,
+            batch_size=batch_size,
+            checkpoint_path=checkpoint,
+            pack_size=pack_size
+        )
+
+        print(f"Ingestion finished: {summary['inserted']} inserted, {summary['duplicates']} duplicates, "
+              f"{summary['failed']} failed, {summary['skipped']} already processed.")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0')
@@ -12,8 +12,25 @@ BEGIN
 END $$;
 
 -- Drop tables if they exist (for clean initialization)
+DROP TABLE IF EXISTS candidate_lsh_bands;
+DROP TABLE IF EXISTS candidate_skills;
+DROP TABLE IF EXISTS candidate_certifications;
+DROP TABLE IF EXISTS skills;
+DROP TABLE IF EXISTS certifications;
+DROP TABLE IF EXISTS candidate_stat_deltas;
+DROP TABLE IF EXISTS candidate_stats;
+DROP TABLE IF EXISTS resume_jobs;
+DROP TABLE IF EXISTS resume_cache;
+DROP TABLE IF EXISTS resume_files;
 DROP TABLE IF EXISTS candidates;
 DROP TABLE IF EXISTS users;
+DROP SEQUENCE IF EXISTS candidate_set_version;
+
+-- Create search function for array to string conversion
+CREATE OR REPLACE FUNCTION array_to_string_immutable(anyarray, text) 
+RETURNS text AS $$ 
+    SELECT array_to_string($1, $2); 
+$$ LANGUAGE SQL IMMUTABLE;
 
 -- Create users table
 CREATE TABLE users (
@@ -39,22 +56,202 @@ CREATE TABLE candidates (
     industry VARCHAR(100),
     certifications VARCHAR[] DEFAULT '{}',  -- CA, CIMA, CFA, etc.
     resume_path VARCHAR(255),  -- Path to stored resume
+    embedding BYTEA,  -- float32 vector for job-match shortlisting
+    minhash BYTEA,  -- uint32 MinHash signature for duplicate detection
+    -- Weighted full-text document (A: name, skills; B: certifications, industry,
+    -- level; C: education, contact details; D: experience)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(array_to_string_immutable(skills, ' '), '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(array_to_string_immutable(certifications, ' '), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(industry, '') || ' ' || coalesce(experience_level, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(education, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(email, '') || ' ' || coalesce(phone, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(experience, '')), 'D')
+    ) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     created_by INTEGER REFERENCES users(id)
 );
 
+-- Create canonical skill/certification taxonomy and candidate links
+CREATE TABLE skills (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,  -- Display form, e.g. JavaScript
+    key VARCHAR(100) UNIQUE NOT NULL  -- Lowercased lookup key
+);
+
+CREATE TABLE certifications (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,  -- Display form, e.g. CA
+    key VARCHAR(100) UNIQUE NOT NULL  -- Lowercased lookup key
+);
+
+CREATE TABLE candidate_skills (
+    candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+    skill_id INTEGER REFERENCES skills(id) ON DELETE CASCADE,
+    PRIMARY KEY (candidate_id, skill_id)
+);
+
+CREATE TABLE candidate_certifications (
+    candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+    certification_id INTEGER REFERENCES certifications(id) ON DELETE CASCADE,
+    PRIMARY KEY (candidate_id, certification_id)
+);
+
+CREATE INDEX idx_candidate_skills_skill ON candidate_skills(skill_id, candidate_id);
+CREATE INDEX idx_candidate_certifications_certification ON candidate_certifications(certification_id, candidate_id);
+
+-- Create MinHash LSH band index for near-duplicate detection
+CREATE TABLE candidate_lsh_bands (
+    band SMALLINT,  -- Signature band; -1 = normalized name, -2 = phone number
+    bucket BIGINT,  -- Hash of the band's rows (or of the name/phone key)
+    candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, candidate_id)
+);
+
+CREATE INDEX idx_candidate_lsh_bands_candidate ON candidate_lsh_bands(candidate_id);
+
+-- Create cache of GPT resume extractions
+CREATE TABLE resume_cache (
+    key VARCHAR(64) PRIMARY KEY,  -- SHA-256 of model, prompt version and cleaned text
+    model VARCHAR(64),
+    prompt_version VARCHAR(16),
+    result JSON NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    hit_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_resume_cache_last_accessed ON resume_cache(last_accessed_at);
+
+-- Create content-addressed resume files table
+CREATE TABLE resume_files (
+    sha256 VARCHAR(64) PRIMARY KEY,  -- SHA-256 of the PDF; the file lives in <uploads>/<2>/<2>/<sha256>.pdf
+    path VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,  -- Candidates whose resume_path is this file
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_resume_files_last_uploaded ON resume_files(last_uploaded_at);
+
+-- Create background resume-processing jobs table
+CREATE TABLE resume_jobs (
+    id VARCHAR(36) PRIMARY KEY,  -- UUID
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed
+    stage VARCHAR(32),
+    progress INTEGER DEFAULT 0,
+    result JSON,
+    status_code INTEGER,
+    error TEXT,
+    resume_path VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_by INTEGER REFERENCES users(id)
+);
+
+-- Version of the candidate set, bumped by the application after every change
+-- so cached job-match rankings can be invalidated
+CREATE SEQUENCE candidate_set_version;
+
+-- Create incrementally maintained candidate statistics
+CREATE TABLE candidate_stats (
+    dimension VARCHAR(32) NOT NULL,  -- total, experience_level, industry, skill, certification
+    value TEXT NOT NULL,  -- '' stands for NULL
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dimension, value)
+);
+
+CREATE INDEX idx_candidate_stats_dimension_count ON candidate_stats(dimension, count);
+CREATE INDEX idx_candidate_stats_updated_at ON candidate_stats(updated_at);
+
+-- Count changes appended by each statement; stats reads add the ones still
+-- pending and fold them into candidate_stats once STATS_COMPACT_THRESHOLD pile up
+CREATE TABLE candidate_stat_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    dimension VARCHAR(32) NOT NULL,
+    value TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+);
+
+CREATE INDEX idx_candidate_stat_deltas_dimension_value ON candidate_stat_deltas(dimension, value);
+
+-- Statement-level triggers append each statement's changes without touching
+-- the shared candidate_stats rows, so concurrent writers do not queue on them
+CREATE OR REPLACE FUNCTION candidate_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO candidate_stat_deltas (dimension, value, delta)
+        WITH changed AS (SELECT 1 AS delta, experience_level, industry, skills, certifications FROM new_rows)
+        SELECT dimension, value, sum(delta)
+        FROM (
+            SELECT 'total' AS dimension, '' AS value, delta FROM changed
+            UNION ALL SELECT 'experience_level', coalesce(experience_level, ''), delta FROM changed
+            UNION ALL SELECT 'industry', coalesce(industry, ''), delta FROM changed
+            UNION ALL SELECT 'skill', skill, delta FROM changed, unnest(skills) AS skill
+            UNION ALL SELECT 'certification', cert, delta FROM changed, unnest(certifications) AS cert
+        ) deltas
+        GROUP BY dimension, value
+        HAVING sum(delta) <> 0;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO candidate_stat_deltas (dimension, value, delta)
+        WITH changed AS (SELECT -1 AS delta, experience_level, industry, skills, certifications FROM old_rows)
+        SELECT dimension, value, sum(delta)
+        FROM (
+            SELECT 'total' AS dimension, '' AS value, delta FROM changed
+            UNION ALL SELECT 'experience_level', coalesce(experience_level, ''), delta FROM changed
+            UNION ALL SELECT 'industry', coalesce(industry, ''), delta FROM changed
+            UNION ALL SELECT 'skill', skill, delta FROM changed, unnest(skills) AS skill
+            UNION ALL SELECT 'certification', cert, delta FROM changed, unnest(certifications) AS cert
+        ) deltas
+        GROUP BY dimension, value
+        HAVING sum(delta) <> 0;
+    ELSE
+        INSERT INTO candidate_stat_deltas (dimension, value, delta)
+        WITH changed AS (SELECT 1 AS delta, experience_level, industry, skills, certifications FROM new_rows
+                UNION ALL SELECT -1 AS delta, experience_level, industry, skills, certifications FROM old_rows)
+        SELECT dimension, value, sum(delta)
+        FROM (
+            SELECT 'total' AS dimension, '' AS value, delta FROM changed
+            UNION ALL SELECT 'experience_level', coalesce(experience_level, ''), delta FROM changed
+            UNION ALL SELECT 'industry', coalesce(industry, ''), delta FROM changed
+            UNION ALL SELECT 'skill', skill, delta FROM changed, unnest(skills) AS skill
+            UNION ALL SELECT 'certification', cert, delta FROM changed, unnest(certifications) AS cert
+        ) deltas
+        GROUP BY dimension, value
+        HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER candidate_stats_insert
+AFTER INSERT ON candidates
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
+CREATE TRIGGER candidate_stats_update
+AFTER UPDATE ON candidates
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
+CREATE TRIGGER candidate_stats_delete
+AFTER DELETE ON candidates
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION candidate_stats_trigger();
+
 -- Create indexes for better search performance
 CREATE INDEX idx_candidates_email ON candidates(email);
 CREATE INDEX idx_candidates_experience_level ON candidates(experience_level);
 CREATE INDEX idx_candidates_industry ON candidates(industry);
 CREATE INDEX idx_candidates_name ON candidates(name);
-
--- Create search function for array to string conversion
-CREATE OR REPLACE FUNCTION array_to_string_immutable(anyarray, text) 
-RETURNS text AS $$ 
-    SELECT array_to_string($1, $2); 
-$$ LANGUAGE SQL IMMUTABLE;
+CREATE INDEX idx_candidates_search_vector ON candidates USING gin (search_vector);
 
 -- Create indexes based on available extensions
 DO $$